@@ -151,6 +151,7 @@ class ExportConfig(BaseSettings):
     paper_size: str = Field(default="letter", description="Paper size")
     print_margins: int = Field(default=20, description="Print margins")
     excel_include_formulas: bool = Field(default=True, description="Excel include formulas")
+    pdf_workers: int = Field(default=0, description="Bulk PDF worker processes (0 = CPU count)")
 
     model_config = {"env_prefix": "EXPORT_"}
 
@@ -278,6 +278,7 @@ CREATE INDEX IF NOT EXISTS idx_companies_name ON companies(company_name);
 CREATE INDEX IF NOT EXISTS idx_companies_npwp ON companies(npwp);
 CREATE INDEX IF NOT EXISTS idx_companies_active ON companies(is_active);
 CREATE INDEX IF NOT EXISTS idx_companies_name_trgm ON companies USING gin(company_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_companies_npwp_trgm ON companies USING gin(npwp gin_trgm_ops);
 
 -- TKA worker indexes
 CREATE INDEX IF NOT EXISTS idx_tka_name_trgm ON tka_workers USING gin(nama gin_trgm_ops);
@@ -296,9 +297,11 @@ CREATE INDEX IF NOT EXISTS idx_job_name_trgm ON job_descriptions USING gin(job_n
 
 -- Invoice indexes
 CREATE INDEX IF NOT EXISTS idx_invoice_number ON invoices(invoice_number);
+CREATE INDEX IF NOT EXISTS idx_invoice_number_trgm ON invoices USING gin(invoice_number gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_invoice_company_date ON invoices(company_id, invoice_date DESC);
-CREATE INDEX IF NOT EXISTS idx_invoice_status ON invoices(status);
-CREATE INDEX IF NOT EXISTS idx_invoice_date_range ON invoices(invoice_date DESC);
+CREATE INDEX IF NOT EXISTS idx_invoice_status_list ON invoices(status, invoice_date DESC, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_invoice_list_order ON invoices(invoice_date DESC, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_invoice_created ON invoices(created_at DESC);
 
 -- Invoice line indexes
 CREATE INDEX IF NOT EXISTS idx_invoice_lines_invoice_id ON invoice_lines(invoice_id, line_order);
@@ -25,6 +25,7 @@ from PyQt6.QtGui import QFont, QPixmap, QPainter, QColor
 from config import get_config, validate_configuration, app_config, ui_config
 from models.database import db_manager, init_database
 from ui.main_window import MainWindow
+from ui.dialogs import prewarm_message_boxes
 from services.cache_service import warm_up_cache, cleanup_cache
 from utils.helpers import ensure_directory
 
@@ -181,6 +182,9 @@ class InvoiceApplication(QApplication):
             # Load stylesheet
             self._load_stylesheet()
             
+            # Resolve message box icons and styles once, before the first error
+            prewarm_message_boxes()
+            
             logging.info("Application setup completed")
             
         except Exception as e:
@@ -381,6 +385,10 @@ def main():
         return 130
 
 if __name__ == "__main__":
+    # Required for bulk PDF export worker processes in frozen builds
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     # Change to script directory
     os.chdir(Path(__file__).parent)
     
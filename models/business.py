@@ -57,25 +57,29 @@ class InvoiceBusinessLogic:
             # Standard rounding for other cases
             return vat_raw.quantize(Decimal('1'), rounding=ROUND_HALF_UP)
     
-    def calculate_invoice_totals(self, invoice: Invoice) -> Dict[str, Decimal]:
-        """Calculate all invoice totals"""
-        subtotal = Decimal('0')
+    def calculate_invoice_totals(self, invoice: Invoice, subtotal: Optional[Decimal] = None) -> Dict[str, Decimal]:
+        """Calculate all invoice totals
         
-        # Safely handle relationship iteration to avoid Pylance errors
-        try:
-            # Always query lines directly to avoid relationship iteration issues
-            lines = self.session.query(InvoiceLine).filter(
-                InvoiceLine.invoice_id == invoice.id
-            ).all()
-            
-            for line in lines:
-                if line.line_total:
-                    subtotal += safe_decimal(line.line_total)
-                    
-        except Exception as e:
-            logger.warning(f"Error calculating invoice totals: {e}")
-            # Ultimate fallback
+        Pass subtotal when the line totals are already known to skip reading the lines back.
+        """
+        if subtotal is None:
             subtotal = Decimal('0')
+            
+            # Safely handle relationship iteration to avoid Pylance errors
+            try:
+                # Always query lines directly to avoid relationship iteration issues
+                lines = self.session.query(InvoiceLine).filter(
+                    InvoiceLine.invoice_id == invoice.id
+                ).all()
+                
+                for line in lines:
+                    if line.line_total:
+                        subtotal += safe_decimal(line.line_total)
+                        
+            except Exception as e:
+                logger.warning(f"Error calculating invoice totals: {e}")
+                # Ultimate fallback
+                subtotal = Decimal('0')
         
         vat_percentage = safe_decimal(invoice.vat_percentage) if invoice.vat_percentage else Decimal('11.00')
         vat_amount = self.calculate_vat_amount(subtotal, vat_percentage)
@@ -87,9 +91,9 @@ class InvoiceBusinessLogic:
             'total_amount': total_amount
         }
     
-    def update_invoice_totals(self, invoice: Invoice) -> None:
-        """Update invoice totals based on line items"""
-        totals = self.calculate_invoice_totals(invoice)
+    def update_invoice_totals(self, invoice: Invoice, subtotal: Optional[Decimal] = None) -> None:
+        """Update invoice totals based on line items (or a precomputed subtotal)"""
+        totals = self.calculate_invoice_totals(invoice, subtotal)
         # Convert to the type expected by SQLAlchemy (Decimal will be stored properly)
         invoice.subtotal = totals['subtotal']
         invoice.vat_amount = totals['vat_amount'] 
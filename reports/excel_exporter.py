@@ -31,6 +31,9 @@ from config import export_config, app_config
 
 logger = logging.getLogger(__name__)
 
+# Shared cell alignment for count columns
+CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+
 class ExcelStyleManager:
     """Manages Excel styles and formatting"""
     
@@ -209,6 +212,9 @@ class ExcelReportGenerator:
         # Key metrics table
         metrics_start_row = 5
         
+        # Column widths tracked as the tables are written (the merged title rows are excluded)
+        widths = [len('Status Breakdown'), 0, 0]
+        
         # Headers
         headers = ['Metric', 'Value']
         for col, header in enumerate(headers, 1):
@@ -228,6 +234,8 @@ class ExcelReportGenerator:
         
         for row_idx, (metric, value) in enumerate(metrics, metrics_start_row + 1):
             ws.cell(row=row_idx, column=1, value=metric).style = "data_style"
+            widths[0] = max(widths[0], len(metric))
+            widths[1] = max(widths[1], len(str(value)))
             
             cell = ws.cell(row=row_idx, column=2)
             if 'Amount' in metric:
@@ -246,14 +254,19 @@ class ExcelReportGenerator:
         for col, header in enumerate(status_headers, 1):
             ws.cell(row=chart_start_row + 1, column=col).value = header
             ws.cell(row=chart_start_row + 1, column=col).style = "header_style"
+            widths[col - 1] = max(widths[col - 1], len(header))
         
         for row_idx, (status, count) in enumerate(status_counts.items(), chart_start_row + 2):
+            amount = status_amounts.get(status, 0)
             ws.cell(row=row_idx, column=1, value=status.title()).style = "data_style"
             ws.cell(row=row_idx, column=2, value=count).style = "data_style"
-            ws.cell(row=row_idx, column=3, value=status_amounts.get(status, 0)).style = "currency_style"
+            ws.cell(row=row_idx, column=3, value=amount).style = "currency_style"
+            widths[0] = max(widths[0], len(status))
+            widths[1] = max(widths[1], len(str(count)))
+            widths[2] = max(widths[2], len(str(amount)))
         
-        # Auto-adjust column widths
-        self._auto_adjust_columns(ws)
+        # Set column widths tracked during row emission
+        self._set_column_widths(ws, widths)
     
     def _create_detailed_sheet(self, wb: openpyxl.Workbook, invoice_data: List[Dict]):
         """Create detailed invoice list sheet"""
@@ -265,14 +278,19 @@ class ExcelReportGenerator:
             'Subtotal', 'VAT Amount', 'Total Amount', 'Created By', 'Created Date'
         ]
         
+        widths = [len(header) for header in headers]
+        
         # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = header
-            cell.style = "header_style"
+        self._append_row(ws, headers, ["header_style"] * len(headers))
+        
+        # Style per column: currency for amounts, date for dates
+        styles = [
+            "data_style", "date_style", "data_style", "data_style", "data_style",
+            "currency_style", "currency_style", "currency_style", "data_style", "date_style"
+        ]
         
         # Write data
-        for row, invoice in enumerate(invoice_data, 2):
+        for invoice in invoice_data:
             data = [
                 invoice.get('invoice_number', ''),
                 invoice.get('invoice_date'),
@@ -286,17 +304,7 @@ class ExcelReportGenerator:
                 invoice.get('created_at')
             ]
             
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row, column=col)
-                cell.value = value
-                
-                # Apply appropriate style
-                if col in [6, 7, 8]:  # Currency columns
-                    cell.style = "currency_style"
-                elif col in [2, 10]:  # Date columns
-                    cell.style = "date_style"
-                else:
-                    cell.style = "data_style"
+            self._append_row(ws, data, styles, widths)
         
         # Add data bars for amount columns
         if len(invoice_data) > 0:
@@ -306,8 +314,8 @@ class ExcelReportGenerator:
             rule = DataBarRule(start_type='min', end_type='max', color='5B9BD5')
             ws.conditional_formatting.add(data_range, rule)
         
-        # Auto-adjust columns
-        self._auto_adjust_columns(ws)
+        # Set column widths tracked during row emission
+        self._set_column_widths(ws, widths)
         
         # Freeze panes
         ws.freeze_panes = 'A2'
@@ -351,13 +359,18 @@ class ExcelReportGenerator:
             'Average Amount', 'Draft', 'Finalized', 'Paid'
         ]
         
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = header
-            cell.style = "header_style"
+        widths = [len(header) for header in headers]
+        
+        self._append_row(ws, headers, ["header_style"] * len(headers))
+        
+        styles = [
+            "data_style", "data_style", "data_style", "currency_style",
+            "currency_style", "data_style", "data_style", "data_style"
+        ]
+        count_cols = (3, 6, 7, 8)
         
         # Data
-        for row, (company_name, stats) in enumerate(sorted_companies, 2):
+        for company_name, stats in sorted_companies:
             data = [
                 company_name,
                 format_npwp_display(stats['npwp']),
@@ -369,20 +382,12 @@ class ExcelReportGenerator:
                 stats['statuses'].get('paid', 0)
             ]
             
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row, column=col)
-                cell.value = value
-                
-                if col in [4, 5]:  # Currency columns
-                    cell.style = "currency_style"
-                elif col in [3, 6, 7, 8]:  # Count columns
-                    cell.style = "data_style"
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                else:
-                    cell.style = "data_style"
-        
-        # Auto-adjust columns
-        self._auto_adjust_columns(ws)
+            cells = self._append_row(ws, data, styles, widths)
+            for col in count_cols:  # Count columns
+                cells[col - 1].alignment = CENTER_ALIGNMENT
+        
+        # Set column widths tracked during row emission
+        self._set_column_widths(ws, widths)
         
         # Create chart if we have data
         if len(sorted_companies) > 0:
@@ -442,10 +447,11 @@ class ExcelReportGenerator:
         # Headers
         headers = ['Year', 'Month', 'Invoice Count', 'Total Amount', 'Average Amount']
         
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = header
-            cell.style = "header_style"
+        widths = [len(header) for header in headers]
+        
+        self._append_row(ws, headers, ["header_style"] * len(headers))
+        
+        styles = ["data_style", "data_style", "data_style", "currency_style", "currency_style"]
         
         # Data
         month_names = [
@@ -453,7 +459,7 @@ class ExcelReportGenerator:
             'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'
         ]
         
-        for row, (month_key, stats) in enumerate(sorted_months, 2):
+        for month_key, stats in sorted_months:
             avg_amount = stats['total_amount'] / stats['count'] if stats['count'] > 0 else 0
             
             data = [
@@ -464,17 +470,10 @@ class ExcelReportGenerator:
                 avg_amount
             ]
             
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row, column=col)
-                cell.value = value
-                
-                if col in [4, 5]:  # Currency columns
-                    cell.style = "currency_style"
-                else:
-                    cell.style = "data_style"
+            self._append_row(ws, data, styles, widths)
         
-        # Auto-adjust columns
-        self._auto_adjust_columns(ws)
+        # Set column widths tracked during row emission
+        self._set_column_widths(ws, widths)
         
         # Create trend chart
         if len(sorted_months) > 1:
@@ -525,13 +524,14 @@ class ExcelReportGenerator:
         # Headers
         headers = ['Status', 'Count', 'Percentage', 'Total Amount', 'Average Amount']
         
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = header
-            cell.style = "header_style"
+        widths = [len(header) for header in headers]
+        
+        self._append_row(ws, headers, ["header_style"] * len(headers))
+        
+        styles = ["data_style", "data_style", "data_style", "currency_style", "currency_style"]
         
         # Data
-        for row, (status, stats) in enumerate(status_stats.items(), 2):
+        for status, stats in status_stats.items():
             avg_amount = stats['total_amount'] / stats['count'] if stats['count'] > 0 else 0
             
             data = [
@@ -542,20 +542,11 @@ class ExcelReportGenerator:
                 avg_amount
             ]
             
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row, column=col)
-                cell.value = value
-                
-                if col == 3:  # Percentage
-                    cell.style = "data_style"
-                    cell.number_format = '0.00%'
-                elif col in [4, 5]:  # Currency
-                    cell.style = "currency_style"
-                else:
-                    cell.style = "data_style"
-        
-        # Auto-adjust columns
-        self._auto_adjust_columns(ws)
+            cells = self._append_row(ws, data, styles, widths)
+            cells[2].number_format = '0.00%'  # Percentage
+        
+        # Set column widths tracked during row emission
+        self._set_column_widths(ws, widths)
         
         # Create pie chart
         if len(status_stats) > 0:
@@ -576,21 +567,23 @@ class ExcelReportGenerator:
         # Add chart to worksheet
         ws.add_chart(chart, "G2")
     
-    def _auto_adjust_columns(self, ws):
-        """Auto-adjust column widths"""
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+    def _append_row(self, ws, values: List[Any], styles: List[str],
+                    widths: Optional[List[int]] = None) -> Tuple:
+        """Append a row in one call and apply a named style per column"""
+        ws.append(values)
+        cells = ws[ws.max_row]
+        for idx, (cell, style) in enumerate(zip(cells, styles)):
+            cell.style = style
+            if widths is not None and values[idx] is not None:
+                widths[idx] = max(widths[idx], len(str(values[idx])))
+        return cells
+    
+    def _set_column_widths(self, ws, widths: List[int]):
+        """Set column widths tracked while the rows were written"""
+        col_letter = get_column_letter
+        dimensions = ws.column_dimensions
+        for col, width in enumerate(widths, 1):
+            dimensions[col_letter(col)].width = min(width + 2, 50)
 
 # Global instance
 excel_generator = ExcelReportGenerator()
@@ -357,6 +357,9 @@ class PDFGenerator:
         # Table data
         table_data = [headers]
         
+        # Same date on every row, format it once
+        date_str = format_date_short(invoice.invoice_date)
+        
         for line in invoice.lines:
             # TKA name
             tka_name = line.tka_worker.nama if line.tka_worker else "Unknown"
@@ -378,7 +381,7 @@ class PDFGenerator:
             
             row = [
                 Paragraph(str(line.baris), self.styles['TableCellCenter']),
-                Paragraph(format_date_short(invoice.invoice_date), self.styles['TableCellCenter']),
+                Paragraph(date_str, self.styles['TableCellCenter']),
                 Paragraph(tka_name, self.styles['TableCell']),
                 Paragraph(keterangan, self.styles['TableCell']),
                 Paragraph(format_currency_idr(line.line_total, show_symbol=False), self.styles['TableCellRight'])
@@ -426,11 +429,17 @@ class PDFGenerator:
         """Build totals section"""
         content = []
         
+        # Format each amount once and reuse the strings
+        fmt = format_currency_idr
+        subtotal_str = fmt(invoice_data['subtotal'], show_symbol=False)
+        vat_str = fmt(invoice_data['vat_amount'], show_symbol=False)
+        total_str = fmt(invoice_data['total_amount'], show_symbol=False)
+        
         # Totals table (right-aligned)
         totals_data = [
-            ['', 'Subtotal:', format_currency_idr(invoice_data['subtotal'], show_symbol=False)],
-            ['', f"PPN {invoice_data['vat_percentage']}%:", format_currency_idr(invoice_data['vat_amount'], show_symbol=False)],
-            ['', 'Total:', format_currency_idr(invoice_data['total_amount'], show_symbol=False)]
+            ['', 'Subtotal:', subtotal_str],
+            ['', f"PPN {invoice_data['vat_percentage']}%:", vat_str],
+            ['', 'Total:', total_str]
         ]
         
         totals_table = Table(totals_data, colWidths=[3.5*inch, 1.2*inch, 1.3*inch])
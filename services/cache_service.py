@@ -205,6 +205,29 @@ class RedisCache:
             logger.error(f"Redis delete error: {e}")
             return False
     
+    def incr(self, key: str) -> Optional[int]:
+        """Atomically increment a counter in Redis"""
+        if not self.enabled:
+            return None
+        
+        try:
+            return self.redis_client.incr(key)
+        except Exception as e:
+            logger.error(f"Redis incr error: {e}")
+            return None
+    
+    def get_counter(self, key: str) -> Optional[int]:
+        """Get counter value from Redis"""
+        if not self.enabled:
+            return None
+        
+        try:
+            value = self.redis_client.get(key)
+            return int(value) if value is not None else 0
+        except Exception as e:
+            logger.error(f"Redis get error: {e}")
+            return None
+    
     def clear(self) -> None:
         """Clear all Redis keys"""
         if not self.enabled:
@@ -225,6 +248,10 @@ class CacheService:
             default_ttl=3600
         )
         
+        # Namespace versions, bumped to invalidate a whole namespace at once
+        self._namespace_versions: Dict[str, int] = {}
+        self._lock = Lock()
+        
         # Statistics
         self._hits = 0
         self._misses = 0
@@ -280,6 +307,25 @@ class CacheService:
         memory_deleted = self.memory_cache.delete(key)
         return redis_deleted or memory_deleted
     
+    def namespace_version(self, namespace: str) -> int:
+        """Get current version of a cache namespace"""
+        version = self.redis_cache.get_counter(f"{namespace}:ver")
+        if version is not None:
+            return version
+        
+        with self._lock:
+            return self._namespace_versions.get(namespace, 0)
+    
+    def bump_namespace(self, namespace: str) -> None:
+        """Invalidate all entries of a namespace by moving it to a new version
+        
+        Old entries are never read again and age out by TTL or LRU eviction.
+        """
+        self.redis_cache.incr(f"{namespace}:ver")
+        
+        with self._lock:
+            self._namespace_versions[namespace] = self._namespace_versions.get(namespace, 0) + 1
+    
     def clear(self, pattern: str = None) -> None:
         """Clear cache entries"""
         if pattern:
@@ -309,18 +355,26 @@ class CacheService:
 # Global cache service instance
 cache_service = CacheService()
 
-def cached(prefix: str, ttl: int = 3600, use_args: bool = True, use_kwargs: bool = True):
-    """Decorator for caching function results"""
+def cached(prefix: str, ttl: int = 3600, use_args: bool = True, use_kwargs: bool = True,
+           namespace: str = None):
+    """Decorator for caching function results
+    
+    Results cached under a namespace are all invalidated by bump_namespace(namespace).
+    """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
+            key_prefix = prefix
+            if namespace:
+                key_prefix = f"{namespace}:v{cache_service.namespace_version(namespace)}:{prefix}"
+            
             # Generate cache key
             if use_args or use_kwargs:
                 key_args = args if use_args else ()
                 key_kwargs = kwargs if use_kwargs else {}
-                cache_key = cache_service._generate_key(prefix, *key_args, **key_kwargs)
+                cache_key = cache_service._generate_key(key_prefix, *key_args, **key_kwargs)
             else:
-                cache_key = prefix
+                cache_key = key_prefix
             
             # Try to get from cache
             cached_result = cache_service.get(cache_key)
@@ -342,6 +396,10 @@ def invalidate_cache(pattern: str) -> None:
     """Invalidate cache entries matching pattern"""
     cache_service.clear(pattern)
 
+def bump_namespace(namespace: str) -> None:
+    """Invalidate all cache entries of a namespace without scanning keys"""
+    cache_service.bump_namespace(namespace)
+
 class QueryCache:
     """Specialized cache for database queries"""
     
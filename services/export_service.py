@@ -4,29 +4,24 @@ Comprehensive service for exporting invoices to PDF and Excel formats
 with professional layouts and business formatting.
 """
 
+import io
 import os
+import zipfile
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Any, Union, BinaryIO
+from typing import Dict, List, Optional, Any, Tuple, Union, BinaryIO, Iterable, TYPE_CHECKING
 import logging
 
-# PDF Generation
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch, mm
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, 
-    PageBreak, Frame, PageTemplate, BaseDocTemplate
-)
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-
-# Excel Generation
-import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl.utils import get_column_letter
-from openpyxl.drawing import Image as XLImage
+# ReportLab and openpyxl are slow to import, so they are loaded inside the
+# PDF/Excel code paths that need them rather than at module import time.
+if TYPE_CHECKING:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
 
 from models.database import Invoice, get_db_session
 from services.invoice_service import InvoiceService
@@ -39,74 +34,101 @@ from config import export_config, app_config
 
 logger = logging.getLogger(__name__)
 
+# Shared stylesheet, built on first use and reused by every PDF export
+_STYLES = None
+
+def _service_scope(service: Optional[InvoiceService] = None):
+    """Use the caller's InvoiceService as-is, or open (and close) a new one"""
+    return nullcontext(service) if service is not None else InvoiceService()
+
+def _get_styles():
+    """Get sample stylesheet with custom paragraph styles (built once per process)"""
+    global _STYLES
+    if _STYLES is not None:
+        return _STYLES
+    
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_LEFT, TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    
+    styles = getSampleStyleSheet()
+    
+    # Header style
+    styles.add(ParagraphStyle(
+        'CustomHeader',
+        parent=styles['Heading1'],
+        fontSize=20,
+        textColor=colors.black,
+        alignment=TA_CENTER,
+        spaceAfter=12
+    ))
+    
+    # Company info style
+    styles.add(ParagraphStyle(
+        'CompanyInfo',
+        parent=styles['Normal'],
+        fontSize=10,
+        alignment=TA_CENTER,
+        spaceAfter=6
+    ))
+    
+    # Invoice details style
+    styles.add(ParagraphStyle(
+        'InvoiceDetails',
+        parent=styles['Normal'],
+        fontSize=10,
+        alignment=TA_LEFT,
+        spaceAfter=6
+    ))
+    
+    # Table header style
+    styles.add(ParagraphStyle(
+        'TableHeader',
+        parent=styles['Normal'],
+        fontSize=8,
+        alignment=TA_CENTER,
+        textColor=colors.black
+    ))
+    
+    # Table cell style
+    styles.add(ParagraphStyle(
+        'TableCell',
+        parent=styles['Normal'],
+        fontSize=8,
+        alignment=TA_LEFT
+    ))
+    
+    _STYLES = styles
+    return _STYLES
+
 class PDFExportService:
     """Service for exporting invoices to PDF format"""
     
     def __init__(self):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.units import inch
+        
         self.page_size = letter  # Can be changed to A4 if needed
         self.margin = 0.75 * inch
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        # Header style
-        self.styles.add(ParagraphStyle(
-            'CustomHeader',
-            parent=self.styles['Heading1'],
-            fontSize=20,
-            textColor=colors.black,
-            alignment=TA_CENTER,
-            spaceAfter=12
-        ))
-        
-        # Company info style
-        self.styles.add(ParagraphStyle(
-            'CompanyInfo',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            alignment=TA_CENTER,
-            spaceAfter=6
-        ))
-        
-        # Invoice details style
-        self.styles.add(ParagraphStyle(
-            'InvoiceDetails',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            alignment=TA_LEFT,
-            spaceAfter=6
-        ))
-        
-        # Table header style
-        self.styles.add(ParagraphStyle(
-            'TableHeader',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            alignment=TA_CENTER,
-            textColor=colors.black
-        ))
-        
-        # Table cell style
-        self.styles.add(ParagraphStyle(
-            'TableCell',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            alignment=TA_LEFT
-        ))
-    
-    def export_invoice_pdf(self, invoice_id: int, output_path: str = None) -> str:
+        self.styles = _get_styles()
+        
+        # Resolved once; export methods only join filenames onto it
+        self.export_dir = ensure_directory(export_config.export_directory)
+    
+    def export_invoice_pdf(self, invoice_id: int, output_path: str = None,
+                           service: Optional[InvoiceService] = None) -> str:
         """
         Export single invoice to PDF
         
         Args:
             invoice_id: ID of invoice to export
             output_path: Optional custom output path
+            service: Optional open InvoiceService to reuse (left open)
             
         Returns:
             Path to generated PDF file
         """
-        with InvoiceService() as service:
+        with _service_scope(service) as service:
             invoice = service.get_invoice(invoice_id)
             if not invoice:
                 raise ValueError(f"Invoice {invoice_id} not found")
@@ -114,28 +136,64 @@ class PDFExportService:
             # Generate filename if not provided
             if not output_path:
                 filename = safe_filename(f"Invoice_{invoice.invoice_number}.pdf")
-                output_dir = ensure_directory(export_config.export_directory)
-                output_path = output_dir / filename
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                str(output_path),
-                pagesize=self.page_size,
-                rightMargin=self.margin,
-                leftMargin=self.margin,
-                topMargin=self.margin,
-                bottomMargin=self.margin
-            )
+                output_path = self.export_dir / filename
             
             # Build PDF content
             story = self._build_invoice_content(invoice)
             
             # Generate PDF
-            doc.build(story)
+            Path(output_path).write_bytes(self._render_pdf(story))
             
             logger.info(f"Exported invoice {invoice.invoice_number} to PDF: {output_path}")
             return str(output_path)
     
+    def export_invoices_pdf(self, invoices: List[Invoice], output_path: str = None) -> str:
+        """
+        Export multiple invoices into a single PDF document
+        
+        Args:
+            invoices: List of invoices to export
+            output_path: Optional custom output path
+            
+        Returns:
+            Path to generated PDF file
+        """
+        from reportlab.platypus import PageBreak
+        
+        if not output_path:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = safe_filename(f"Invoices_Export_{timestamp}.pdf")
+            output_path = self.export_dir / filename
+        
+        # Each invoice starts on a new page of one shared document
+        story = []
+        for invoice in invoices:
+            if story:
+                story.append(PageBreak())
+            story.extend(self._build_invoice_content(invoice))
+        
+        # Generate PDF
+        Path(output_path).write_bytes(self._render_pdf(story))
+        
+        logger.info(f"Exported {len(invoices)} invoices to PDF: {output_path}")
+        return str(output_path)
+    
+    def _render_pdf(self, story: List) -> bytes:
+        """Render story into an in-memory PDF so the file is written in one call"""
+        from reportlab.platypus import SimpleDocTemplate
+        
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=self.page_size,
+            rightMargin=self.margin,
+            leftMargin=self.margin,
+            topMargin=self.margin,
+            bottomMargin=self.margin
+        )
+        doc.build(story)
+        return buffer.getvalue()
+    
     def _build_invoice_content(self, invoice: Invoice) -> List:
         """Build PDF content for invoice"""
         story = []
@@ -162,6 +220,8 @@ class PDFExportService:
     
     def _build_header(self) -> List:
         """Build company header section"""
+        from reportlab.platypus import Paragraph, Spacer
+        
         content = []
         
         # Company name
@@ -189,13 +249,18 @@ class PDFExportService:
     
     def _build_invoice_details(self, invoice: Invoice) -> List:
         """Build invoice details section"""
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Spacer, Table, TableStyle
+        
         content = []
         
+        date_str = format_date_long(invoice.invoice_date)
+        
         # Invoice title and details in table format
         invoice_data = [
-            ['INVOICE', '', 'Jakarta, ' + format_date_long(invoice.invoice_date)],
+            ['INVOICE', '', f'Jakarta, {date_str}'],
             ['', '', ''],
-            ['No. Invoice:', invoice.invoice_number, f'Halaman: 1 dari 1']
+            ['No. Invoice:', invoice.invoice_number, 'Halaman: 1 dari 1']
         ]
         
         invoice_table = Table(invoice_data, colWidths=[2*inch, 2*inch, 2*inch])
@@ -215,6 +280,8 @@ class PDFExportService:
     
     def _build_recipient_info(self, invoice: Invoice) -> List:
         """Build recipient company information"""
+        from reportlab.platypus import Paragraph, Spacer
+        
         content = []
         
         # Kepada section
@@ -235,41 +302,25 @@ class PDFExportService:
     
     def _build_invoice_table(self, invoice: Invoice) -> List:
         """Build invoice items table"""
+        from reportlab.lib import colors
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Table, TableStyle
+        
         content = []
         
         # Table headers
         headers = ['No', 'Tanggal', 'Expatriat', 'Keterangan', 'Harga (Rp)']
         
+        # Loop invariants: every row shows the invoice date
+        date_str = format_date_short(invoice.invoice_date)
+        fmt = format_currency_idr
+        
         # Table data
         table_data = [headers]
-        
-        for i, line in enumerate(invoice.lines, 1):
-            # Get TKA name
-            tka_name = line.tka_worker.nama if line.tka_worker else "Unknown"
-            
-            # Get job description
-            job_desc = line.custom_job_description or (
-                line.job_description.job_description if line.job_description else ""
-            )
-            job_name = line.custom_job_name or (
-                line.job_description.job_name if line.job_description else ""
-            )
-            
-            # Format description with quantity if > 1
-            keterangan = job_name
-            if line.quantity > 1:
-                keterangan += f" ({line.quantity}x)"
-            if job_desc and job_desc != job_name:
-                keterangan += f"\n{job_desc}"
-            
-            row = [
-                str(line.baris),
-                format_date_short(invoice.invoice_date),
-                tka_name,
-                keterangan,
-                format_currency_idr(line.line_total, show_symbol=False)
-            ]
-            table_data.append(row)
+        table_data.extend([
+            [str(line.baris), date_str, *self._line_display(line), fmt(line.line_total, show_symbol=False)]
+            for line in invoice.lines
+        ])
         
         # Create table
         col_widths = [0.5*inch, 1*inch, 1.5*inch, 2.5*inch, 1.5*inch]
@@ -302,17 +353,46 @@ class PDFExportService:
         
         return content
     
+    def _line_display(self, line) -> Tuple[str, str]:
+        """Get (TKA name, description) display strings for an invoice line"""
+        tka_name = line.tka_worker.nama if line.tka_worker else "Unknown"
+        
+        # Touch the job description relationship only once
+        jd = line.job_description
+        job_name = line.custom_job_name or (jd.job_name if jd else "")
+        job_desc = line.custom_job_description or (jd.job_description if jd else "")
+        
+        # Format description with quantity if > 1
+        keterangan = job_name
+        quantity = line.quantity
+        if quantity > 1:
+            keterangan += f" ({quantity}x)"
+        if job_desc and job_desc != job_name:
+            keterangan += f"\n{job_desc}"
+        
+        return tka_name, keterangan
+    
     def _build_totals_section(self, invoice: Invoice) -> List:
         """Build totals section"""
+        from reportlab.lib import colors
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+        
         content = []
         
         content.append(Spacer(1, 15))
         
+        # Format each amount once and reuse the strings
+        fmt = format_currency_idr
+        subtotal_str = fmt(invoice.subtotal, show_symbol=False)
+        vat_str = fmt(invoice.vat_amount, show_symbol=False)
+        total_str = fmt(invoice.total_amount, show_symbol=False)
+        
         # Totals table (right-aligned)
         totals_data = [
-            ['', 'Subtotal:', format_currency_idr(invoice.subtotal, show_symbol=False)],
-            ['', f'PPN {invoice.vat_percentage}%:', format_currency_idr(invoice.vat_amount, show_symbol=False)],
-            ['', 'Total:', format_currency_idr(invoice.total_amount, show_symbol=False)],
+            ['', 'Subtotal:', subtotal_str],
+            ['', f'PPN {invoice.vat_percentage}%:', vat_str],
+            ['', 'Total:', total_str],
         ]
         
         totals_table = Table(totals_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
@@ -336,6 +416,9 @@ class PDFExportService:
     
     def _build_footer_section(self, invoice: Invoice) -> List:
         """Build footer with bank info and signature"""
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+        
         content = []
         
         content.append(Spacer(1, 20))
@@ -375,6 +458,8 @@ class ExcelExportService:
     """Service for exporting data to Excel format"""
     
     def __init__(self):
+        from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+        
         self.font_name = 'Calibri'
         self.header_font = Font(name=self.font_name, size=12, bold=True)
         self.normal_font = Font(name=self.font_name, size=10)
@@ -388,44 +473,105 @@ class ExcelExportService:
             top=Side(style='thin'),
             bottom=Side(style='thin')
         )
+        
+        # Alignments (shared by reference across cells)
+        self.center_align = Alignment(horizontal='center')
+        self.right_align = Alignment(horizontal='right')
+        
+        # Resolved once; export methods only join filenames onto it
+        self.export_dir = ensure_directory(export_config.export_directory)
     
-    def export_invoices_excel(self, invoices: List[Invoice], output_path: str = None) -> str:
+    def export_invoices_excel(self, export_data: Dict[str, Iterable[Tuple]], output_path: str = None) -> str:
         """
         Export multiple invoices to Excel
         
         Args:
-            invoices: List of invoices to export
+            export_data: 'invoices' and 'lines' row iterables, as produced by
+                InvoiceService.get_invoices_for_export or the iter_*_for_export streams
             output_path: Optional custom output path
             
         Returns:
             Path to generated Excel file
         """
+        import openpyxl
+        
         if not output_path:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = safe_filename(f"Invoices_Export_{timestamp}.xlsx")
-            output_dir = ensure_directory(export_config.export_directory)
-            output_path = output_dir / filename
-        
-        # Create workbook
-        wb = openpyxl.Workbook()
+            output_path = self.export_dir / filename
         
-        # Remove default sheet
-        wb.remove(wb.active)
+        # Create write-only workbook (rows are streamed, no Cell objects kept)
+        wb = openpyxl.Workbook(write_only=True)
+        self._add_named_styles(wb)
         
         # Create invoice summary sheet
-        self._create_invoice_summary_sheet(wb, invoices)
+        invoice_count = self._create_invoice_summary_sheet(wb, export_data['invoices'])
         
         # Create invoice details sheet
-        self._create_invoice_details_sheet(wb, invoices)
+        self._create_invoice_details_sheet(wb, export_data['lines'])
         
         # Save workbook
         wb.save(output_path)
         
-        logger.info(f"Exported {len(invoices)} invoices to Excel: {output_path}")
+        logger.info(f"Exported {invoice_count} invoices to Excel: {output_path}")
         return str(output_path)
     
-    def _create_invoice_summary_sheet(self, wb: openpyxl.Workbook, invoices: List[Invoice]):
-        """Create invoice summary sheet"""
+    def _add_named_styles(self, wb: 'openpyxl.Workbook') -> None:
+        """Register the named styles used by export cells (one style entry each)"""
+        from openpyxl.styles import NamedStyle
+        
+        header_style = NamedStyle(name="export_header")
+        header_style.font = self.header_font
+        header_style.fill = self.header_fill
+        header_style.border = self.border
+        header_style.alignment = self.center_align
+        wb.add_named_style(header_style)
+        
+        data_style = NamedStyle(name="export_data")
+        data_style.font = self.normal_font
+        data_style.border = self.border
+        wb.add_named_style(data_style)
+        
+        currency_style = NamedStyle(name="export_currency")
+        currency_style.font = self.normal_font
+        currency_style.border = self.border
+        currency_style.number_format = '#,##0'
+        currency_style.alignment = self.right_align
+        wb.add_named_style(currency_style)
+    
+    def _data_cells(self, ws, data: List[Any], currency_columns: Tuple[int, ...]) -> List['WriteOnlyCell']:
+        """Build styled data cells for a write-only worksheet row"""
+        from openpyxl.cell import WriteOnlyCell
+        
+        cells = []
+        for col, value in enumerate(data):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = "export_currency" if col in currency_columns else "export_data"
+            cells.append(cell)
+        return cells
+    
+    def _header_cells(self, ws, headers: List[str]) -> List['WriteOnlyCell']:
+        """Build styled header cells for a write-only worksheet"""
+        from openpyxl.cell import WriteOnlyCell
+        
+        cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.style = "export_header"
+            cells.append(cell)
+        return cells
+    
+    def _set_column_widths(self, ws, widths: List[int]) -> None:
+        """Set column widths (must run before the first row is appended)"""
+        from openpyxl.utils import get_column_letter
+        
+        col_letter = get_column_letter
+        dimensions = ws.column_dimensions
+        for col, width in enumerate(widths, 1):
+            dimensions[col_letter(col)].width = min(width + 2, 50)
+    
+    def _create_invoice_summary_sheet(self, wb: 'openpyxl.Workbook', invoice_rows: Iterable[Tuple]) -> int:
+        """Create invoice summary sheet, returning the number of invoices written"""
         ws = wb.create_sheet("Invoice Summary")
         
         # Headers
@@ -434,57 +580,41 @@ class ExcelExportService:
             'Subtotal', 'VAT Amount', 'Total Amount', 'Created By', 'Created Date'
         ]
         
+        # Rows are streamed, so widths are fixed up front from typical content
+        self._set_column_widths(ws, [16, 10, 40, 20, 10, 14, 14, 14, 20, 12])
+        
         # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = header
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.border = self.border
-            cell.alignment = Alignment(horizontal='center')
+        ws.append(self._header_cells(ws, headers))
+        
+        # Bind loop invariants once for the per-row loop
+        append = ws.append
+        data_cells = self._data_cells
+        npwp_display = format_npwp_display
         
         # Write data
-        for row, invoice in enumerate(invoices, 2):
+        count = 0
+        for (invoice_number, invoice_date, company_name, npwp, status,
+             subtotal, vat_amount, total_amount, creator_name, created_at) in invoice_rows:
             data = [
-                invoice.invoice_number,
-                invoice.invoice_date,
-                invoice.company.company_name,
-                format_npwp_display(invoice.company.npwp),
-                invoice.status.title(),
-                float(invoice.subtotal),
-                float(invoice.vat_amount),
-                float(invoice.total_amount),
-                invoice.creator.full_name,
-                invoice.created_at.date() if invoice.created_at else None
+                invoice_number,
+                invoice_date,
+                company_name,
+                npwp_display(npwp),
+                status.title(),
+                subtotal,
+                vat_amount,
+                total_amount,
+                creator_name,
+                created_at.date() if created_at else None
             ]
             
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row, column=col)
-                cell.value = value
-                cell.font = self.normal_font
-                cell.border = self.border
-                
-                # Format currency columns
-                if col in [6, 7, 8]:  # Subtotal, VAT, Total columns
-                    cell.number_format = '#,##0'
-                    cell.alignment = Alignment(horizontal='right')
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+            # Currency columns: Subtotal, VAT, Total
+            append(data_cells(ws, data, (5, 6, 7)))
+            count += 1
+        
+        return count
     
-    def _create_invoice_details_sheet(self, wb: openpyxl.Workbook, invoices: List[Invoice]):
+    def _create_invoice_details_sheet(self, wb: 'openpyxl.Workbook', line_rows: Iterable[Tuple]):
         """Create invoice details sheet"""
         ws = wb.create_sheet("Invoice Details")
         
@@ -494,99 +624,143 @@ class ExcelExportService:
             'Job Description', 'Quantity', 'Unit Price', 'Line Total'
         ]
         
+        # Rows are streamed, so widths are fixed up front from typical content
+        self._set_column_widths(ws, [16, 8, 30, 30, 48, 8, 14, 14])
+        
         # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = header
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.border = self.border
-            cell.alignment = Alignment(horizontal='center')
+        ws.append(self._header_cells(ws, headers))
         
-        # Write data
-        current_row = 2
-        for invoice in invoices:
-            for line in invoice.lines:
-                data = [
-                    invoice.invoice_number,
-                    line.baris,
-                    line.tka_worker.nama if line.tka_worker else "Unknown",
-                    line.custom_job_name or (line.job_description.job_name if line.job_description else ""),
-                    line.custom_job_description or (line.job_description.job_description if line.job_description else ""),
-                    line.quantity,
-                    float(line.unit_price),
-                    float(line.line_total)
-                ]
-                
-                for col, value in enumerate(data, 1):
-                    cell = ws.cell(row=current_row, column=col)
-                    cell.value = value
-                    cell.font = self.normal_font
-                    cell.border = self.border
-                    
-                    # Format currency columns
-                    if col in [7, 8]:  # Unit price, Line total
-                        cell.number_format = '#,##0'
-                        cell.alignment = Alignment(horizontal='right')
-                
-                current_row += 1
+        # Bind loop invariants once for the per-row loop
+        append = ws.append
+        data_cells = self._data_cells
         
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
+        # Write data
+        for (invoice_number, baris, tka_name, custom_job_name, job_name,
+             custom_job_description, job_description, quantity, unit_price, line_total) in line_rows:
+            data = [
+                invoice_number,
+                baris,
+                tka_name or "Unknown",
+                custom_job_name or job_name or "",
+                custom_job_description or job_description or "",
+                quantity,
+                unit_price,
+                line_total
+            ]
             
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+            # Currency columns: Unit price, Line total
+            append(data_cells(ws, data, (6, 7)))
 
 class ExportService:
     """Main export service combining PDF and Excel functionality"""
     
     def __init__(self):
-        self.pdf_service = PDFExportService()
-        self.excel_service = ExcelExportService()
+        # Sub-services are created on first use so only the needed library is imported
+        self._pdf_service: Optional[PDFExportService] = None
+        self._excel_service: Optional[ExcelExportService] = None
+    
+    @property
+    def pdf_service(self) -> PDFExportService:
+        """PDF export service (created on first use)"""
+        if self._pdf_service is None:
+            self._pdf_service = PDFExportService()
+        return self._pdf_service
     
-    def export_invoice_pdf(self, invoice_id: int, output_path: str = None) -> str:
+    @property
+    def excel_service(self) -> ExcelExportService:
+        """Excel export service (created on first use)"""
+        if self._excel_service is None:
+            self._excel_service = ExcelExportService()
+        return self._excel_service
+    
+    def export_invoice_pdf(self, invoice_id: int, output_path: str = None,
+                           service: Optional[InvoiceService] = None) -> str:
         """Export single invoice to PDF"""
-        return self.pdf_service.export_invoice_pdf(invoice_id, output_path)
+        return self.pdf_service.export_invoice_pdf(invoice_id, output_path, service)
     
-    def export_invoices_excel(self, invoice_ids: List[int], output_path: str = None) -> str:
+    def export_invoices_excel(self, invoice_ids: List[int], output_path: str = None,
+                              service: Optional[InvoiceService] = None) -> str:
         """Export multiple invoices to Excel"""
-        with InvoiceService() as service:
-            invoices = []
-            for invoice_id in invoice_ids:
-                invoice = service.get_invoice(invoice_id)
-                if invoice:
-                    invoices.append(invoice)
-        
-        return self.excel_service.export_invoices_excel(invoices, output_path)
+        with _service_scope(service) as service:
+            export_data = service.get_invoices_for_export(invoice_ids)
+        return self.excel_service.export_invoices_excel(export_data, output_path)
+    
+    def export_invoices_pdf(self, invoice_ids: List[int], output_path: str = None,
+                            service: Optional[InvoiceService] = None) -> str:
+        """Export multiple invoices to a single PDF"""
+        with _service_scope(service) as service:
+            invoices = service.get_invoices_bulk(invoice_ids)
+            return self.pdf_service.export_invoices_pdf(invoices, output_path)
+    
+    def export_invoices_pdf_zip(self, invoice_ids: List[int], output_path: str = None,
+                                service: Optional[InvoiceService] = None) -> str:
+        """Export one PDF per invoice, rendered in parallel worker processes, into a ZIP archive"""
+        if not output_path:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = safe_filename(f"Invoices_Export_{timestamp}.zip")
+            output_path = self.pdf_service.export_dir / filename
+        
+        # Archive names follow the single-invoice export; the files themselves are rendered
+        # under a private directory, so exports already in export_dir are never touched
+        with _service_scope(service) as service:
+            numbers = dict(service.session.query(Invoice.id, Invoice.invoice_number)
+                           .filter(Invoice.id.in_(invoice_ids)))
+            
+            with tempfile.TemporaryDirectory(prefix="invoice_zip_") as tmp_dir:
+                pdf_paths = [str(Path(tmp_dir) / f"{invoice_id}.pdf") for invoice_id in invoice_ids]
+                
+                # ReportLab layout is pure Python, so spread invoices across processes.
+                # Spawned workers open their own database connections instead of
+                # inheriting the parent's pooled ones.
+                workers = min(len(invoice_ids), export_config.pdf_workers or os.cpu_count() or 1)
+                if workers > 1:
+                    context = multiprocessing.get_context('spawn')
+                    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                        list(executor.map(export_invoice_pdf, invoice_ids, pdf_paths))
+                else:
+                    for invoice_id, pdf_path in zip(invoice_ids, pdf_paths):
+                        self.export_invoice_pdf(invoice_id, pdf_path, service=service)
+                
+                try:
+                    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                        for invoice_id, pdf_path in zip(invoice_ids, pdf_paths):
+                            arcname = safe_filename(f"Invoice_{numbers.get(invoice_id, invoice_id)}.pdf")
+                            archive.write(pdf_path, arcname=arcname)
+                except Exception:
+                    # Do not leave a partial archive behind
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+                    raise
+        
+        logger.info(f"Exported {len(pdf_paths)} invoice PDFs to: {output_path}")
+        return str(output_path)
     
     def export_invoices_by_criteria(self, criteria: Dict[str, Any], 
-                                  export_format: str = 'excel') -> str:
+                                  export_format: str = 'excel',
+                                  as_zip: bool = False) -> str:
         """Export invoices based on criteria"""
         with InvoiceService() as service:
-            # Get invoices based on criteria
-            result = service.get_invoices_list(
-                page=1, 
-                per_page=10000,  # Large number to get all matching
-                filters=criteria
-            )
-            
-            invoice_ids = [inv['id'] for inv in result['invoices']]
-            
             if export_format.lower() == 'pdf':
-                # For PDF, export each invoice separately and return zip file path
-                # This would require additional zip functionality
-                raise NotImplementedError("Bulk PDF export not implemented yet")
-            else:
-                return self.export_invoices_excel(invoice_ids)
+                # Get invoices based on criteria
+                result = service.get_invoices_list(
+                    page=1, 
+                    per_page=10000,  # Large number to get all matching
+                    filters=criteria
+                )
+                
+                invoice_ids = [inv['id'] for inv in result['invoices']]
+                
+                # Reuse this session rather than opening one per export step
+                if as_zip:
+                    return self.export_invoices_pdf_zip(invoice_ids, service=service)
+                return self.export_invoices_pdf(invoice_ids, service=service)
+            
+            # Stream matching rows straight into the write-only workbook
+            export_data = {
+                'invoices': service.iter_invoices_for_export(criteria),
+                'lines': service.iter_invoice_lines_for_export(criteria)
+            }
+            return self.excel_service.export_invoices_excel(export_data)
 
 # Global export service instance
 export_service = ExportService()
@@ -599,6 +773,10 @@ def export_invoices_excel(invoice_ids: List[int], output_path: str = None) -> st
     """Convenience function to export invoices to Excel"""
     return export_service.export_invoices_excel(invoice_ids, output_path)
 
+def export_invoices_pdf(invoice_ids: List[int], output_path: str = None) -> str:
+    """Convenience function to export invoices to a single PDF"""
+    return export_service.export_invoices_pdf(invoice_ids, output_path)
+
 if __name__ == "__main__":
     # Test export service
     print("Testing export service...")
@@ -6,18 +6,27 @@ with validation, error reporting, and batch processing.
 
 import os
 import csv
+import codecs
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Any, Tuple, Union, BinaryIO
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Union, BinaryIO, Iterable, Iterator
 import logging
 
+from sqlalchemy import insert
+
 # Excel handling
 import openpyxl
 from openpyxl import load_workbook
 
 # CSV handling
 import pandas as pd
+import chardet
 
 from models.database import (
     Company, TkaWorker, TkaFamilyMember, JobDescription, 
@@ -35,6 +44,32 @@ from config import export_config
 
 logger = logging.getLogger(__name__)
 
+# Validated rows are written with one multi-row INSERT per batch
+IMPORT_BATCH_SIZE = 1000
+
+# Import files are parsed and cleaned this many rows at a time
+READ_CHUNK_SIZE = 10000
+
+# Bytes sampled from the start of a CSV file to pick its encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Parsed chunks buffered ahead of the DB insert loop
+READ_AHEAD_CHUNKS = 2
+
+# Codec error handler for CSV bytes past the encoding sample that do not fit the detected encoding
+CSV_DECODE_FALLBACK = 'invoice-csv-cp1252-fallback'
+
+# Text values accepted for boolean and gender columns; the readers lowercase these columns
+_FLAG_COLUMNS = frozenset({'is_active', 'jenis_kelamin', 'gender'})
+_BOOL_TRUE = frozenset({'true', '1', 'yes', 'ya', 'active', 'aktif'})
+_GENDER_MAP = {
+    'male': 'Laki-laki', 'laki-laki': 'Laki-laki', 'laki': 'Laki-laki', 'l': 'Laki-laki', 'm': 'Laki-laki',
+    'female': 'Perempuan', 'perempuan': 'Perempuan', 'wanita': 'Perempuan', 'p': 'Perempuan', 'f': 'Perempuan',
+}
+
+# Accepted formats for dates given as text
+_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+
 class ImportError(Exception):
     """Custom exception for import operations"""
     def __init__(self, message: str, row_number: int = None, field: str = None):
@@ -101,6 +136,322 @@ class ImportResult:
             'imported_ids': self.imported_ids
         }
 
+def _insert_batch(session, model, pending: List[Tuple[int, Dict[str, Any]]], result: ImportResult):
+    """Insert buffered (row_number, data) rows in one statement and record their IDs
+    
+    The batch runs in a savepoint, so batches already inserted are kept. If it
+    fails, its rows are retried with a savepoint each, so only the offending
+    rows are reported and the rest of the batch is still inserted.
+    """
+    if not pending:
+        return
+    
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    try:
+        with session.begin_nested():
+            ids = session.execute(statement, [data for _, data in pending]).scalars().all()
+    except Exception:
+        # Find the failing rows one savepoint at a time
+        for row_number, data in pending:
+            try:
+                with session.begin_nested():
+                    entity_id = session.execute(statement, [data]).scalar_one()
+            except Exception as e:
+                # The driver error alone; the wrapper repeats the statement and its parameters
+                result.add_error(f"Error inserting row: {getattr(e, 'orig', None) or e}", row_number)
+            else:
+                result.add_success(entity_id)
+    else:
+        for entity_id in ids:
+            result.add_success(entity_id)
+    
+    pending.clear()
+
+def _parse_boolean(value: Any) -> bool:
+    """Parse boolean value from various formats"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value in _BOOL_TRUE  # already lowercased by the readers
+    if isinstance(value, (int, float)):
+        return bool(value)
+    return True  # Default to True
+
+def _normalize_gender(gender: str) -> str:
+    """Normalize gender values"""
+    if not gender:
+        return 'Laki-laki'
+    return _GENDER_MAP.get(gender, 'Laki-laki')  # Already lowercased by the readers; default Laki-laki
+
+def _parse_date(value: Any) -> date:
+    """Parse date from various formats"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        parsed = _parse_date_string(value.strip())
+        if parsed is not None:
+            return parsed
+    
+    return date.today()  # Default to today
+
+@lru_cache(maxsize=1024)
+def _parse_date_string(value: str) -> Optional[date]:
+    """Parse a text date; cached because import files repeat the same few dates"""
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+@lru_cache(maxsize=8192)
+def _clean_text(value: str) -> str:
+    """clean_string memoised; import columns repeat the same values (names, codes, statuses)"""
+    return clean_string(value)
+
+@lru_cache(maxsize=1024)
+def _clean_flag_text(value: str) -> str:
+    """Cleaned and lowercased text for _FLAG_COLUMNS, so the row parsers only do table lookups"""
+    return clean_string(value).lower()
+
+def _clean_cell(value: Any) -> Any:
+    """Clean string cells, leave other values untouched"""
+    return _clean_text(value) if isinstance(value, str) else value
+
+def _clean_flag_cell(value: Any) -> Any:
+    """Clean and lowercase string cells of a flag column, leave other values untouched"""
+    return _clean_flag_text(value) if isinstance(value, str) else value
+
+# Bytes decoded by _decode_as_cp1252 on this thread, reported once per CSV file
+_decode_fallback = threading.local()
+
+def _decode_as_cp1252(error: UnicodeError) -> Tuple[str, int]:
+    """Decode bytes the detected encoding rejects as cp1252 (latin-1 for its undefined bytes)
+    
+    A cp1252 file whose encoding sample is plain ASCII is detected as UTF-8; this
+    keeps its later accented names instead of storing U+FFFD in their place.
+    """
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    
+    raw = error.object[error.start:error.end]
+    _decode_fallback.count = getattr(_decode_fallback, 'count', 0) + len(raw)
+    chars = []
+    for byte in raw:
+        try:
+            chars.append(bytes((byte,)).decode('cp1252'))
+        except UnicodeDecodeError:
+            chars.append(chr(byte))
+    return ''.join(chars), error.end
+
+codecs.register_error(CSV_DECODE_FALLBACK, _decode_as_cp1252)
+
+def _read_ahead(iterable: Iterable, maxsize: int = READ_AHEAD_CHUNKS) -> Iterator:
+    """Consume iterable in a worker thread and yield its items on the calling thread
+    
+    File parsing then overlaps with validation and inserts, while the DB session
+    is only ever used by the caller. Reader errors are re-raised here.
+    """
+    items = queue.Queue(maxsize)
+    stop = threading.Event()
+    end = object()
+    
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    # Consumer stopped early; let a generator release its file now
+                    close = getattr(iterable, 'close', None)
+                    if close:
+                        close()
+                    return
+        finally:
+            put(end)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(produce)
+        try:
+            while True:
+                item = items.get()
+                if item is end:
+                    break
+                yield item
+            future.result()
+        finally:
+            stop.set()
+
+def _rows_to_frame(rows: List[tuple], columns: List[str], first_row: int) -> pd.DataFrame:
+    """Build a cleaned object-dtype chunk from raw sheet rows numbered from first_row"""
+    df = pd.DataFrame(rows, columns=columns, dtype=object)
+    df.insert(0, '_row_number', range(first_row, first_row + len(rows)))
+    return _clean_frame(df)
+
+def _clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop empty rows, clean text cells and turn missing values into None"""
+    df = df.dropna(how='all', subset=df.columns[1:])
+    
+    # clean_string on text columns; non-string cells are left as they are
+    for col in df.columns[1:]:
+        if pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'mixed', 'mixed-integer'):
+            continue
+        df[col] = df[col].map(_clean_flag_cell if col in _FLAG_COLUMNS else _clean_cell, na_action='ignore')
+    
+    return df.astype(object).where(df.notna(), None)
+
+def _iter_records(df: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+    """Yield DataFrame rows as dicts by zipping the column arrays
+    
+    Much cheaper than iterrows() or to_dict('records'), which build a Series or box
+    every value individually. Columns must already be object dtype.
+    """
+    columns = list(df.columns)
+    arrays = [df.iloc[:, i].to_numpy() for i in range(len(columns))]
+    for values in zip(*arrays):
+        yield dict(zip(columns, values))
+
+class ImportLookups:
+    """In-memory reference tables for resolving import rows without per-row queries
+    
+    prefetch() loads the rows a file refers to with one IN query per table; anything
+    it does not resolve falls back to loading the whole table once. Matching mirrors
+    the old per-row filters: an exact NPWP/passport (or name) match, otherwise the
+    first case-insensitive substring match on the name. Results are memoised per
+    identifier, since import files repeat the same few references on many rows.
+    """
+    
+    def __init__(self, session):
+        self.session = session
+        self._companies_by_npwp: Dict[str, Any] = {}
+        self._companies_by_name: Dict[str, Any] = {}
+        self._company_names: Optional[List[Tuple[str, Any]]] = None
+        self._tka_by_passport: Dict[str, Any] = {}
+        self._tka_by_name: Dict[str, Any] = {}
+        self._tka_names: Optional[List[Tuple[str, Any]]] = None
+        self._jobs_by_company: Dict[int, List[Tuple[str, Any]]] = {}
+        self._resolved: Dict[tuple, Any] = {}
+    
+    def prefetch(self, company_identifiers=(), tka_identifiers=()):
+        """Load the companies, TKA workers and their job descriptions referenced by an import"""
+        # Identifiers already resolved (or covered by a full table load) are not queried again
+        idents = [] if self._company_names is not None else [
+            i for i in {str(i) for i in company_identifiers if i}
+            if i not in self._companies_by_npwp and i.lower() not in self._companies_by_name
+        ]
+        if idents:
+            self._add_companies(self.session.query(Company.id, Company.npwp, Company.company_name).filter(
+                Company.npwp.in_(idents) | Company.company_name.in_(idents)
+            ))
+            self._load_jobs({row.id for row in self._companies_by_npwp.values()})
+        
+        idents = [] if self._tka_names is not None else [
+            i for i in {str(i) for i in tka_identifiers if i}
+            if i not in self._tka_by_passport and i.lower() not in self._tka_by_name
+        ]
+        if idents:
+            self._add_tka_workers(self.session.query(TkaWorker.id, TkaWorker.passport, TkaWorker.nama).filter(
+                TkaWorker.passport.in_(idents) | TkaWorker.nama.in_(idents)
+            ))
+    
+    def iter_prefetched(self, chunks: Iterable[pd.DataFrame]) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of each chunk after prefetching the companies it refers to"""
+        for chunk in chunks:
+            rows = list(_iter_records(chunk))
+            self.prefetch(row.get('company_npwp') or row.get('company_name') for row in rows)
+            yield from rows
+    
+    def find_company(self, identifier: Any):
+        """Find company row (id, npwp, company_name) by NPWP or partial name"""
+        identifier = str(identifier)
+        key = ('company', identifier)
+        if key in self._resolved:
+            return self._resolved[key]
+        
+        company = self._companies_by_npwp.get(identifier) or self._companies_by_name.get(identifier.lower())
+        if company is None:
+            if self._company_names is None:
+                self._company_names = []
+                self._add_companies(self.session.query(Company.id, Company.npwp, Company.company_name))
+                company = self._companies_by_npwp.get(identifier)
+            if company is None:
+                company = self._match_name(identifier, self._company_names)
+        
+        self._resolved[key] = company
+        return company
+    
+    def find_tka_worker(self, identifier: Any):
+        """Find TKA worker row (id, passport, nama) by passport or partial name"""
+        identifier = str(identifier)
+        key = ('tka', identifier)
+        if key in self._resolved:
+            return self._resolved[key]
+        
+        tka_worker = self._tka_by_passport.get(identifier) or self._tka_by_name.get(identifier.lower())
+        if tka_worker is None:
+            if self._tka_names is None:
+                self._tka_names = []
+                self._add_tka_workers(self.session.query(TkaWorker.id, TkaWorker.passport, TkaWorker.nama))
+                tka_worker = self._tka_by_passport.get(identifier)
+            if tka_worker is None:
+                tka_worker = self._match_name(identifier, self._tka_names)
+        
+        self._resolved[key] = tka_worker
+        return tka_worker
+    
+    def find_job_description(self, company_id: int, job_name: Any):
+        """Find job description row (id, company_id, job_name) of a company by partial name"""
+        key = ('job', company_id, str(job_name))
+        if key not in self._resolved:
+            if company_id not in self._jobs_by_company:
+                self._load_jobs([company_id])
+            self._resolved[key] = self._match_name(key[2], self._jobs_by_company[company_id])
+        return self._resolved[key]
+    
+    def _add_companies(self, rows):
+        for row in rows:
+            self._companies_by_npwp[row.npwp] = row
+            self._companies_by_name.setdefault(row.company_name.lower(), row)
+            if self._company_names is not None:
+                self._company_names.append((row.company_name.lower(), row))
+    
+    def _add_tka_workers(self, rows):
+        for row in rows:
+            self._tka_by_passport[row.passport] = row
+            self._tka_by_name.setdefault(row.nama.lower(), row)
+            if self._tka_names is not None:
+                self._tka_names.append((row.nama.lower(), row))
+    
+    def _load_jobs(self, company_ids):
+        company_ids = [cid for cid in company_ids if cid not in self._jobs_by_company]
+        if not company_ids:
+            return
+        for company_id in company_ids:
+            self._jobs_by_company[company_id] = []
+        rows = self.session.query(
+            JobDescription.id, JobDescription.company_id, JobDescription.job_name
+        ).filter(JobDescription.company_id.in_(company_ids))
+        for row in rows:
+            self._jobs_by_company[row.company_id].append((row.job_name.lower(), row))
+    
+    @staticmethod
+    def _match_name(identifier: str, names: List[Tuple[str, Any]]):
+        """Return the first entry whose lowercased name contains identifier"""
+        needle = identifier.lower()
+        for name, row in names:
+            if needle in name:
+                return row
+        return None
+
 class ExcelImportService:
     """Service for importing data from Excel files"""
     
@@ -116,42 +467,49 @@ class ExcelImportService:
     
     def read_excel_file(self, file_path: str, sheet_name: str = None) -> List[Dict[str, Any]]:
         """Read Excel file and return list of dictionaries"""
+        return list(self.iter_excel_rows(file_path, sheet_name))
+    
+    def iter_excel_rows(self, file_path: str, sheet_name: str = None) -> Iterator[Dict[str, Any]]:
+        """Yield Excel rows as dictionaries, reading the sheet READ_CHUNK_SIZE rows at a time"""
+        for chunk in _read_ahead(self.iter_excel_frames(file_path, sheet_name)):
+            yield from _iter_records(chunk)
+    
+    def iter_excel_frames(self, file_path: str, sheet_name: str = None) -> Iterator[pd.DataFrame]:
+        """Yield cleaned DataFrame chunks of READ_CHUNK_SIZE rows with a leading _row_number column"""
         try:
-            workbook = load_workbook(file_path, data_only=True)
-            
-            # Get sheet
-            if sheet_name:
-                if sheet_name not in workbook.sheetnames:
-                    raise ImportError(f"Sheet '{sheet_name}' not found in Excel file")
-                worksheet = workbook[sheet_name]
-            else:
-                worksheet = workbook.active
-            
-            # Read headers from first row
-            headers = []
-            for cell in worksheet[1]:
-                if cell.value:
-                    headers.append(clean_string(str(cell.value)).lower().replace(' ', '_'))
-                else:
-                    headers.append(f'column_{len(headers)}')
-            
-            # Read data rows
-            data = []
-            for row_num, row in enumerate(worksheet.iter_rows(min_row=2, values_only=True), 2):
-                if not any(row):  # Skip empty rows
-                    continue
+            # Read-only mode streams rows from the sheet XML instead of loading every cell
+            wb = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                ws = wb[sheet_name] if sheet_name else wb.active
+                rows = ws.iter_rows(values_only=True)
                 
-                row_data = {'_row_number': row_num}
-                for i, value in enumerate(row):
-                    if i < len(headers):
-                        if value is not None:
-                            row_data[headers[i]] = clean_string(str(value)) if isinstance(value, str) else value
-                        else:
-                            row_data[headers[i]] = None
+                header = next(rows, None)
+                if header is None:
+                    return
                 
-                data.append(row_data)
-            
-            return data
+                # Normalize headers; unnamed columns get positional names
+                width = len(header)
+                columns = [
+                    clean_string(str(col)).lower().replace(' ', '_') if col is not None else f'column_{i}'
+                    for i, col in enumerate(header)
+                ]
+                
+                # Row tuples are buffered as-is; row numbers are derived per chunk (header is row 1)
+                buffer = []
+                first_row = 2
+                for row in rows:
+                    if len(row) != width:
+                        row = (row + (None,) * width)[:width]
+                    buffer.append(row)
+                    if len(buffer) >= READ_CHUNK_SIZE:
+                        yield _rows_to_frame(buffer, columns, first_row)
+                        first_row += len(buffer)
+                        buffer = []
+                
+                if buffer:
+                    yield _rows_to_frame(buffer, columns, first_row)
+            finally:
+                wb.close()
             
         except Exception as e:
             logger.error(f"Error reading Excel file {file_path}: {e}")
@@ -162,7 +520,13 @@ class ExcelImportService:
         result = ImportResult()
         
         try:
-            data = self.read_excel_file(file_path, sheet_name)
+            data = self.iter_excel_rows(file_path, sheet_name)
+            
+            pending = []
+            
+            # Keys already in the database; accepted rows are added so in-file duplicates are caught too
+            existing_npwp = {npwp for (npwp,) in self.session.query(Company.npwp)}
+            existing_idtku = {idtku for (idtku,) in self.session.query(Company.idtku)}
             
             for row_data in data:
                 row_number = row_data.get('_row_number', 0)
@@ -174,7 +538,7 @@ class ExcelImportService:
                         'npwp': row_data.get('npwp'),
                         'idtku': row_data.get('idtku'),
                         'address': row_data.get('address') or row_data.get('alamat'),
-                        'is_active': self._parse_boolean(row_data.get('is_active', True))
+                        'is_active': _parse_boolean(row_data.get('is_active', True))
                     }
                     
                     # Validate data
@@ -184,27 +548,24 @@ class ExcelImportService:
                             result.add_error(error['message'], row_number, error['field'])
                         continue
                     
-                    # Check for duplicates
-                    existing = self.session.query(Company).filter(
-                        (Company.npwp == company_data['npwp']) |
-                        (Company.idtku == company_data['idtku'])
-                    ).first()
-                    
-                    if existing:
+                    # Check for duplicates (in the database or earlier in this file)
+                    if company_data['npwp'] in existing_npwp or company_data['idtku'] in existing_idtku:
                         result.add_warning(f"Company with NPWP/IDTKU already exists", row_number)
                         continue
                     
-                    # Create company
-                    company = Company(**company_data)
-                    self.session.add(company)
-                    self.session.flush()
-                    
-                    result.add_success(company.id)
+                    # Queue company for the next batch insert
+                    existing_npwp.add(company_data['npwp'])
+                    existing_idtku.add(company_data['idtku'])
+                    pending.append((row_number, company_data))
+                    if len(pending) >= IMPORT_BATCH_SIZE:
+                        _insert_batch(self.session, Company, pending, result)
                     
                 except Exception as e:
                     result.add_error(f"Error processing row: {str(e)}", row_number)
                     continue
             
+            _insert_batch(self.session, Company, pending, result)
+            
             if result.success_count > 0:
                 self.session.commit()
             else:
@@ -224,7 +585,12 @@ class ExcelImportService:
         result = ImportResult()
         
         try:
-            data = self.read_excel_file(file_path, sheet_name)
+            data = self.iter_excel_rows(file_path, sheet_name)
+            
+            pending = []
+            
+            # Passports already in the database; accepted rows are added so in-file duplicates are caught too
+            existing_passports = {passport for (passport,) in self.session.query(TkaWorker.passport)}
             
             for row_data in data:
                 row_number = row_data.get('_row_number', 0)
@@ -235,8 +601,8 @@ class ExcelImportService:
                         'nama': normalize_name(row_data.get('nama') or row_data.get('name', '')),
                         'passport': row_data.get('passport') or row_data.get('no_passport', ''),
                         'divisi': row_data.get('divisi') or row_data.get('division'),
-                        'jenis_kelamin': self._normalize_gender(row_data.get('jenis_kelamin') or row_data.get('gender')),
-                        'is_active': self._parse_boolean(row_data.get('is_active', True))
+                        'jenis_kelamin': _normalize_gender(row_data.get('jenis_kelamin') or row_data.get('gender')),
+                        'is_active': _parse_boolean(row_data.get('is_active', True))
                     }
                     
                     # Validate data
@@ -246,26 +612,23 @@ class ExcelImportService:
                             result.add_error(error['message'], row_number, error['field'])
                         continue
                     
-                    # Check for duplicate passport
-                    existing = self.session.query(TkaWorker).filter(
-                        TkaWorker.passport == tka_data['passport']
-                    ).first()
-                    
-                    if existing:
+                    # Check for duplicate passport (in the database or earlier in this file)
+                    if tka_data['passport'] in existing_passports:
                         result.add_warning(f"TKA worker with passport {tka_data['passport']} already exists", row_number)
                         continue
                     
-                    # Create TKA worker
-                    tka_worker = TkaWorker(**tka_data)
-                    self.session.add(tka_worker)
-                    self.session.flush()
-                    
-                    result.add_success(tka_worker.id)
+                    # Queue TKA worker for the next batch insert
+                    existing_passports.add(tka_data['passport'])
+                    pending.append((row_number, tka_data))
+                    if len(pending) >= IMPORT_BATCH_SIZE:
+                        _insert_batch(self.session, TkaWorker, pending, result)
                     
                 except Exception as e:
                     result.add_error(f"Error processing row: {str(e)}", row_number)
                     continue
             
+            _insert_batch(self.session, TkaWorker, pending, result)
+            
             if result.success_count > 0:
                 self.session.commit()
             else:
@@ -285,7 +648,10 @@ class ExcelImportService:
         result = ImportResult()
         
         try:
-            data = self.read_excel_file(file_path, sheet_name)
+            lookups = ImportLookups(self.session)
+            data = lookups.iter_prefetched(_read_ahead(self.iter_excel_frames(file_path, sheet_name)))
+            
+            pending = []
             
             for row_data in data:
                 row_number = row_data.get('_row_number', 0)
@@ -297,10 +663,7 @@ class ExcelImportService:
                         result.add_error("Company identifier (NPWP or name) required", row_number, 'company')
                         continue
                     
-                    company = self.session.query(Company).filter(
-                        (Company.npwp == company_identifier) |
-                        (Company.company_name.ilike(f'%{company_identifier}%'))
-                    ).first()
+                    company = lookups.find_company(company_identifier)
                     
                     if not company:
                         result.add_error(f"Company not found: {company_identifier}", row_number, 'company')
@@ -312,7 +675,7 @@ class ExcelImportService:
                         'job_name': row_data.get('job_name') or row_data.get('nama_pekerjaan'),
                         'job_description': row_data.get('job_description') or row_data.get('deskripsi_pekerjaan'),
                         'price': safe_decimal(row_data.get('price') or row_data.get('harga')),
-                        'is_active': self._parse_boolean(row_data.get('is_active', True)),
+                        'is_active': _parse_boolean(row_data.get('is_active', True)),
                         'sort_order': int(row_data.get('sort_order', 0))
                     }
                     
@@ -323,17 +686,17 @@ class ExcelImportService:
                             result.add_error(error['message'], row_number, error['field'])
                         continue
                     
-                    # Create job description
-                    job_desc = JobDescription(**job_data)
-                    self.session.add(job_desc)
-                    self.session.flush()
-                    
-                    result.add_success(job_desc.id)
+                    # Queue job description for the next batch insert
+                    pending.append((row_number, job_data))
+                    if len(pending) >= IMPORT_BATCH_SIZE:
+                        _insert_batch(self.session, JobDescription, pending, result)
                     
                 except Exception as e:
                     result.add_error(f"Error processing row: {str(e)}", row_number)
                     continue
             
+            _insert_batch(self.session, JobDescription, pending, result)
+            
             if result.success_count > 0:
                 self.session.commit()
             else:
@@ -353,20 +716,26 @@ class ExcelImportService:
         result = ImportResult()
         
         try:
-            data = self.read_excel_file(file_path, sheet_name)
-            
-            # Group rows by invoice number
-            invoice_groups = {}
-            for row_data in data:
+            # Group rows by invoice number straight from the row stream
+            invoice_groups = defaultdict(list)
+            for row_data in self.iter_excel_rows(file_path, sheet_name):
                 invoice_number = row_data.get('invoice_number') or row_data.get('no_invoice')
                 if not invoice_number:
                     result.add_error("Invoice number required", row_data.get('_row_number', 0))
                     continue
-                
-                if invoice_number not in invoice_groups:
-                    invoice_groups[invoice_number] = []
                 invoice_groups[invoice_number].append(row_data)
             
+            # Companies are resolved from each invoice's first row, workers from every row
+            lookups = ImportLookups(self.session)
+            lookups.prefetch(
+                (rows[0].get('company_npwp') or rows[0].get('company_name') for rows in invoice_groups.values()),
+                (row.get('tka_passport') or row.get('tka_name') for rows in invoice_groups.values() for row in rows)
+            )
+            
+            # One service for the whole file; invoices are created a batch at a time
+            invoice_service = InvoiceService(self.session)
+            pending = []
+            
             # Process each invoice
             for invoice_number, rows in invoice_groups.items():
                 try:
@@ -376,10 +745,7 @@ class ExcelImportService:
                     
                     # Get company
                     company_identifier = header_row.get('company_npwp') or header_row.get('company_name')
-                    company = self.session.query(Company).filter(
-                        (Company.npwp == company_identifier) |
-                        (Company.company_name.ilike(f'%{company_identifier}%'))
-                    ).first()
+                    company = lookups.find_company(company_identifier)
                     
                     if not company:
                         result.add_error(f"Company not found: {company_identifier}", row_number)
@@ -389,7 +755,7 @@ class ExcelImportService:
                     invoice_data = {
                         'invoice_number': invoice_number,
                         'company_id': company.id,
-                        'invoice_date': self._parse_date(header_row.get('invoice_date') or header_row.get('tanggal_invoice')),
+                        'invoice_date': _parse_date(header_row.get('invoice_date') or header_row.get('tanggal_invoice')),
                         'vat_percentage': safe_decimal(header_row.get('vat_percentage', 11)),
                         'status': header_row.get('status', 'draft'),
                         'notes': header_row.get('notes') or header_row.get('catatan'),
@@ -402,10 +768,7 @@ class ExcelImportService:
                     for i, row in enumerate(rows):
                         # Get TKA worker
                         tka_identifier = row.get('tka_passport') or row.get('tka_name')
-                        tka_worker = self.session.query(TkaWorker).filter(
-                            (TkaWorker.passport == tka_identifier) |
-                            (TkaWorker.nama.ilike(f'%{tka_identifier}%'))
-                        ).first()
+                        tka_worker = lookups.find_tka_worker(tka_identifier)
                         
                         if not tka_worker:
                             result.add_error(f"TKA worker not found: {tka_identifier}", row.get('_row_number', 0))
@@ -413,10 +776,7 @@ class ExcelImportService:
                         
                         # Get job description
                         job_name = row.get('job_name') or row.get('nama_pekerjaan')
-                        job_desc = self.session.query(JobDescription).filter(
-                            JobDescription.company_id == company.id,
-                            JobDescription.job_name.ilike(f'%{job_name}%')
-                        ).first()
+                        job_desc = lookups.find_job_description(company.id, job_name)
                         
                         if not job_desc:
                             result.add_error(f"Job description not found: {job_name}", row.get('_row_number', 0))
@@ -435,20 +795,17 @@ class ExcelImportService:
                         result.add_error(f"No valid line items for invoice {invoice_number}", row_number)
                         continue
                     
-                    # Create invoice using service
-                    with InvoiceService(self.session) as invoice_service:
-                        invoice, validation = invoice_service.create_invoice(invoice_data, line_items, user_id)
-                        
-                        if validation.is_valid:
-                            result.add_success(invoice.id)
-                        else:
-                            for error in validation.errors:
-                                result.add_error(error['message'], row_number, error.get('field'))
+                    # Queue invoice for the next bulk create
+                    pending.append((row_number, invoice_data, line_items))
+                    if len(pending) >= IMPORT_BATCH_SIZE:
+                        self._create_invoice_batch(invoice_service, pending, user_id, result)
                 
                 except Exception as e:
                     result.add_error(f"Error processing invoice {invoice_number}: {str(e)}", row_number)
                     continue
             
+            self._create_invoice_batch(invoice_service, pending, user_id, result)
+            
             logger.info(f"Imported {result.success_count} invoices from Excel file")
             return result
             
@@ -457,51 +814,30 @@ class ExcelImportService:
             result.add_error(f"Import failed: {str(e)}")
             return result
     
-    def _parse_boolean(self, value: Any) -> bool:
-        """Parse boolean value from various formats"""
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            return value.lower() in ('true', '1', 'yes', 'ya', 'active', 'aktif')
-        if isinstance(value, (int, float)):
-            return bool(value)
-        return True  # Default to True
-    
-    def _normalize_gender(self, gender: str) -> str:
-        """Normalize gender values"""
-        if not gender:
-            return 'Laki-laki'
-        
-        gender_lower = gender.lower()
-        if gender_lower in ('male', 'laki-laki', 'laki', 'l', 'm'):
-            return 'Laki-laki'
-        elif gender_lower in ('female', 'perempuan', 'wanita', 'p', 'f'):
-            return 'Perempuan'
-        else:
-            return 'Laki-laki'  # Default
-    
-    def _parse_date(self, value: Any) -> date:
-        """Parse date from various formats"""
-        if isinstance(value, date):
-            return value
-        if isinstance(value, datetime):
-            return value.date()
-        if isinstance(value, str):
-            # Try common date formats
-            for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y']:
-                try:
-                    return datetime.strptime(value, fmt).date()
-                except ValueError:
-                    continue
+    def _create_invoice_batch(self, invoice_service: InvoiceService, pending: List[Tuple[int, Dict, List[Dict]]],
+                              user_id: int, result: ImportResult):
+        """Create queued (row_number, invoice_data, line_items) invoices and record the outcome"""
+        if not pending:
+            return
+        
+        outcomes = invoice_service.create_invoices_bulk(
+            [(invoice_data, line_items) for _, invoice_data, line_items in pending], user_id
+        )
+        for (row_number, _, _), (invoice_id, validation) in zip(pending, outcomes):
+            if invoice_id is not None:
+                result.add_success(invoice_id)
+            else:
+                for error in validation.errors:
+                    result.add_error(error['message'], row_number, error.get('field'))
         
-        return date.today()  # Default to today
+        pending.clear()
 
 class CSVImportService:
     """Service for importing data from CSV files"""
     
     def __init__(self, session=None):
         self.session = session or get_db_session()
-        self.excel_service = ExcelImportService(session)
+        self.excel_service = ExcelImportService(self.session)
     
     def __enter__(self):
         return self
@@ -512,59 +848,96 @@ class CSVImportService:
     
     def read_csv_file(self, file_path: str, encoding: str = 'utf-8') -> List[Dict[str, Any]]:
         """Read CSV file and return list of dictionaries"""
+        return list(self.iter_csv_rows(file_path, encoding))
+    
+    def iter_csv_rows(self, file_path: str, encoding: str = 'utf-8') -> Iterator[Dict[str, Any]]:
+        """Yield CSV rows as dictionaries, parsing the file READ_CHUNK_SIZE rows at a time"""
+        for chunk in _read_ahead(self.iter_csv_frames(file_path, encoding)):
+            yield from _iter_records(chunk)
+    
+    def iter_csv_frames(self, file_path: str, encoding: str = 'utf-8') -> Iterator[pd.DataFrame]:
+        """Yield cleaned DataFrame chunks of READ_CHUNK_SIZE rows with a leading _row_number column"""
+        enc = self._detect_encoding(file_path, encoding)
+        
         try:
-            # Try different encodings if UTF-8 fails
-            encodings = [encoding, 'utf-8', 'latin-1', 'cp1252']
-            
-            for enc in encodings:
-                try:
-                    df = pd.read_csv(file_path, encoding=enc)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                raise ImportError("Could not decode CSV file with any supported encoding")
-            
-            # Clean column names
-            df.columns = [clean_string(str(col)).lower().replace(' ', '_') for col in df.columns]
-            
-            # Convert to list of dictionaries
-            data = []
-            for index, row in df.iterrows():
-                row_data = {'_row_number': index + 2}  # +2 because pandas is 0-based and we skip header
-                for col, value in row.items():
-                    if pd.notna(value):
-                        row_data[col] = clean_string(str(value)) if isinstance(value, str) else value
-                    else:
-                        row_data[col] = None
-                data.append(row_data)
+            columns = None
+            _decode_fallback.count = 0
+            # Bytes past the sample that do not fit the encoding are read as cp1252 rather than failing the import
+            with pd.read_csv(file_path, encoding=enc, encoding_errors=CSV_DECODE_FALLBACK,
+                             chunksize=READ_CHUNK_SIZE, dtype=str, keep_default_na=False,
+                             na_values=['']) as reader:
+                for chunk in reader:
+                    # Clean column names
+                    if columns is None:
+                        columns = [clean_string(str(col)).lower().replace(' ', '_') for col in chunk.columns]
+                    chunk.columns = columns
+                    
+                    # Normalise whitespace; repeated values are served from the clean cache
+                    for col in columns:
+                        chunk[col] = chunk[col].map(_clean_flag_text if col in _FLAG_COLUMNS else _clean_text,
+                                                    na_action='ignore')
+                    
+                    chunk.insert(0, '_row_number', chunk.index + 2)  # +2 because pandas is 0-based and we skip header
+                    yield chunk.astype(object).where(chunk.notna(), None)
             
-            return data
+            if _decode_fallback.count:
+                logger.warning(f"CSV file {file_path}: {_decode_fallback.count} bytes did not decode as "
+                               f"{enc} and were read as cp1252")
             
         except Exception as e:
             logger.error(f"Error reading CSV file {file_path}: {e}")
             raise ImportError(f"Failed to read CSV file: {str(e)}")
     
+    def _detect_encoding(self, file_path: str, encoding: str) -> str:
+        """Pick the CSV encoding from the first ENCODING_SAMPLE_SIZE bytes
+        
+        The requested encoding (then UTF-8) is kept when the sample decodes with it.
+        Otherwise chardet's guess is used if it is confident, falling back to cp1252,
+        the usual encoding of spreadsheet CSV exports on Windows.
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                sample = f.read(ENCODING_SAMPLE_SIZE)
+        except OSError as e:
+            raise ImportError(f"Failed to read CSV file: {str(e)}")
+        
+        for enc in dict.fromkeys([encoding, 'utf-8']):
+            try:
+                # Incremental decode so a multi-byte character cut off by the sample is not an error
+                codecs.getincrementaldecoder(enc)().decode(sample, final=False)
+                return enc
+            except (UnicodeDecodeError, LookupError):
+                continue
+        
+        detected = chardet.detect(sample)
+        if detected['encoding'] and detected['confidence'] >= 0.5:
+            return detected['encoding']
+        return 'cp1252'
+    
     def import_companies_csv(self, file_path: str, encoding: str = 'utf-8') -> ImportResult:
         """Import companies from CSV file"""
-        # Convert CSV to Excel-like format and use Excel service
-        data = self.read_csv_file(file_path, encoding)
-        return self._import_companies_from_data(data)
+        return self._import_companies_from_data(self.iter_csv_rows(file_path, encoding))
     
     def import_tka_workers_csv(self, file_path: str, encoding: str = 'utf-8') -> ImportResult:
         """Import TKA workers from CSV file"""
-        data = self.read_csv_file(file_path, encoding)
-        return self._import_tka_workers_from_data(data)
+        return self._import_tka_workers_from_data(self.iter_csv_rows(file_path, encoding))
     
     def import_job_descriptions_csv(self, file_path: str, encoding: str = 'utf-8') -> ImportResult:
         """Import job descriptions from CSV file"""
-        data = self.read_csv_file(file_path, encoding)
-        return self._import_job_descriptions_from_data(data)
+        lookups = ImportLookups(self.session)
+        data = lookups.iter_prefetched(_read_ahead(self.iter_csv_frames(file_path, encoding)))
+        return self._import_job_descriptions_from_data(data, lookups)
     
-    def _import_companies_from_data(self, data: List[Dict]) -> ImportResult:
+    def _import_companies_from_data(self, data: Iterable[Dict]) -> ImportResult:
         """Import companies from data list"""
         result = ImportResult()
         
+        pending = []
+        
+        # Keys already in the database; accepted rows are added so in-file duplicates are caught too
+        existing_npwp = {npwp for (npwp,) in self.session.query(Company.npwp)}
+        existing_idtku = {idtku for (idtku,) in self.session.query(Company.idtku)}
+        
         for row_data in data:
             row_number = row_data.get('_row_number', 0)
             
@@ -574,7 +947,7 @@ class CSVImportService:
                     'npwp': row_data.get('npwp'),
                     'idtku': row_data.get('idtku'),
                     'address': row_data.get('address') or row_data.get('alamat'),
-                    'is_active': self.excel_service._parse_boolean(row_data.get('is_active', True))
+                    'is_active': _parse_boolean(row_data.get('is_active', True))
                 }
                 
                 validation = validate_company_data(company_data)
@@ -583,25 +956,24 @@ class CSVImportService:
                         result.add_error(error['message'], row_number, error['field'])
                     continue
                 
-                existing = self.session.query(Company).filter(
-                    (Company.npwp == company_data['npwp']) |
-                    (Company.idtku == company_data['idtku'])
-                ).first()
-                
-                if existing:
+                # Check for duplicates (in the database or earlier in this file)
+                if company_data['npwp'] in existing_npwp or company_data['idtku'] in existing_idtku:
                     result.add_warning(f"Company with NPWP/IDTKU already exists", row_number)
                     continue
                 
-                company = Company(**company_data)
-                self.session.add(company)
-                self.session.flush()
-                
-                result.add_success(company.id)
+                # Queue company for the next batch insert
+                existing_npwp.add(company_data['npwp'])
+                existing_idtku.add(company_data['idtku'])
+                pending.append((row_number, company_data))
+                if len(pending) >= IMPORT_BATCH_SIZE:
+                    _insert_batch(self.session, Company, pending, result)
                 
             except Exception as e:
                 result.add_error(f"Error processing row: {str(e)}", row_number)
                 continue
         
+        _insert_batch(self.session, Company, pending, result)
+        
         if result.success_count > 0:
             self.session.commit()
         else:
@@ -609,10 +981,15 @@ class CSVImportService:
         
         return result
     
-    def _import_tka_workers_from_data(self, data: List[Dict]) -> ImportResult:
+    def _import_tka_workers_from_data(self, data: Iterable[Dict]) -> ImportResult:
         """Import TKA workers from data list"""
         result = ImportResult()
         
+        pending = []
+        
+        # Passports already in the database; accepted rows are added so in-file duplicates are caught too
+        existing_passports = {passport for (passport,) in self.session.query(TkaWorker.passport)}
+        
         for row_data in data:
             row_number = row_data.get('_row_number', 0)
             
@@ -621,8 +998,8 @@ class CSVImportService:
                     'nama': normalize_name(row_data.get('nama') or row_data.get('name', '')),
                     'passport': row_data.get('passport') or row_data.get('no_passport', ''),
                     'divisi': row_data.get('divisi') or row_data.get('division'),
-                    'jenis_kelamin': self.excel_service._normalize_gender(row_data.get('jenis_kelamin') or row_data.get('gender')),
-                    'is_active': self.excel_service._parse_boolean(row_data.get('is_active', True))
+                    'jenis_kelamin': _normalize_gender(row_data.get('jenis_kelamin') or row_data.get('gender')),
+                    'is_active': _parse_boolean(row_data.get('is_active', True))
                 }
                 
                 validation = validate_tka_worker_data(tka_data)
@@ -631,24 +1008,23 @@ class CSVImportService:
                         result.add_error(error['message'], row_number, error['field'])
                     continue
                 
-                existing = self.session.query(TkaWorker).filter(
-                    TkaWorker.passport == tka_data['passport']
-                ).first()
-                
-                if existing:
+                # Check for duplicate passport (in the database or earlier in this file)
+                if tka_data['passport'] in existing_passports:
                     result.add_warning(f"TKA worker with passport {tka_data['passport']} already exists", row_number)
                     continue
                 
-                tka_worker = TkaWorker(**tka_data)
-                self.session.add(tka_worker)
-                self.session.flush()
-                
-                result.add_success(tka_worker.id)
+                # Queue TKA worker for the next batch insert
+                existing_passports.add(tka_data['passport'])
+                pending.append((row_number, tka_data))
+                if len(pending) >= IMPORT_BATCH_SIZE:
+                    _insert_batch(self.session, TkaWorker, pending, result)
                 
             except Exception as e:
                 result.add_error(f"Error processing row: {str(e)}", row_number)
                 continue
         
+        _insert_batch(self.session, TkaWorker, pending, result)
+        
         if result.success_count > 0:
             self.session.commit()
         else:
@@ -656,9 +1032,12 @@ class CSVImportService:
         
         return result
     
-    def _import_job_descriptions_from_data(self, data: List[Dict]) -> ImportResult:
+    def _import_job_descriptions_from_data(self, data: Iterable[Dict], lookups: 'ImportLookups' = None) -> ImportResult:
         """Import job descriptions from data list"""
         result = ImportResult()
+        lookups = lookups or ImportLookups(self.session)
+        
+        pending = []
         
         for row_data in data:
             row_number = row_data.get('_row_number', 0)
@@ -669,10 +1048,7 @@ class CSVImportService:
                     result.add_error("Company identifier (NPWP or name) required", row_number, 'company')
                     continue
                 
-                company = self.session.query(Company).filter(
-                    (Company.npwp == company_identifier) |
-                    (Company.company_name.ilike(f'%{company_identifier}%'))
-                ).first()
+                company = lookups.find_company(company_identifier)
                 
                 if not company:
                     result.add_error(f"Company not found: {company_identifier}", row_number, 'company')
@@ -683,7 +1059,7 @@ class CSVImportService:
                     'job_name': row_data.get('job_name') or row_data.get('nama_pekerjaan'),
                     'job_description': row_data.get('job_description') or row_data.get('deskripsi_pekerjaan'),
                     'price': safe_decimal(row_data.get('price') or row_data.get('harga')),
-                    'is_active': self.excel_service._parse_boolean(row_data.get('is_active', True)),
+                    'is_active': _parse_boolean(row_data.get('is_active', True)),
                     'sort_order': int(row_data.get('sort_order', 0))
                 }
                 
@@ -693,16 +1069,17 @@ class CSVImportService:
                         result.add_error(error['message'], row_number, error['field'])
                     continue
                 
-                job_desc = JobDescription(**job_data)
-                self.session.add(job_desc)
-                self.session.flush()
-                
-                result.add_success(job_desc.id)
+                # Queue job description for the next batch insert
+                pending.append((row_number, job_data))
+                if len(pending) >= IMPORT_BATCH_SIZE:
+                    _insert_batch(self.session, JobDescription, pending, result)
                 
             except Exception as e:
                 result.add_error(f"Error processing row: {str(e)}", row_number)
                 continue
         
+        _insert_batch(self.session, JobDescription, pending, result)
+        
         if result.success_count > 0:
             self.session.commit()
         else:
@@ -715,8 +1092,8 @@ class ImportService:
     
     def __init__(self, session=None):
         self.session = session or get_db_session()
-        self.excel_service = ExcelImportService(session)
-        self.csv_service = CSVImportService(session)
+        self.excel_service = ExcelImportService(self.session)
+        self.csv_service = CSVImportService(self.session)
     
     def __enter__(self):
         return self
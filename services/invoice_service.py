@@ -5,11 +5,14 @@ editing, calculations, and business logic implementation.
 """
 
 from datetime import date, datetime
-from decimal import Decimal
-from typing import Dict, List, Optional, Tuple, Any, Union
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
+from decimal import Decimal, ROUND_HALF_UP
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple, Any, Union, Iterator, Iterable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import Session, joinedload, selectinload, contains_eager
+from sqlalchemy import and_, or_, func, desc, cast, Float, insert, tuple_, select, lambda_stmt, event, literal
 import logging
+import threading
 
 from models.database import (
     Invoice, InvoiceLine, Company, TkaWorker, TkaFamilyMember, 
@@ -19,32 +22,125 @@ from models.business import (
     InvoiceBusinessLogic, DataHelper, ValidationHelper, 
     SettingsHelper, BusinessError
 )
-from services.cache_service import cached, query_cache, invalidate_cache
+from services.cache_service import cached, query_cache, invalidate_cache, bump_namespace
 from utils.validators import (
     validate_invoice_data, validate_invoice_line_data, ValidationResult
 )
 from utils.formatters import format_currency_idr, format_date_short
-from utils.helpers import safe_decimal
+from utils.helpers import safe_decimal, safe_int
 
 logger = logging.getLogger(__name__)
 
+# Invoice lines are built and inserted this many at a time, bounding memory for huge invoices
+LINE_INSERT_BATCH_SIZE = 1000
+
+# Each thread's own InvoiceService, see InvoiceService.for_thread
+_thread_local = threading.local()
+
+# Pattern invalidations scan cache keys, so they run off the committing thread
+_invalidation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-invalidation")
+
+def _run_scheduled_invalidations(session: Session) -> None:
+    """Apply the cache invalidations scheduled on a session once it commits"""
+    # Namespace bumps are O(1) and keep the next list read from seeing stale pages
+    for namespace in session.info.pop('invalidate_namespaces', ()):
+        bump_namespace(namespace)
+    for pattern in session.info.pop('invalidate_patterns', ()):
+        _invalidation_executor.submit(invalidate_cache, pattern)
+
+# The statistics queries are independent, so they run side by side on their own connections
+_statistics_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="invoice-statistics")
+
+def _in_own_session(query: Callable[[Session], Any]) -> Any:
+    """Run query on a new session and close it, for use from worker threads"""
+    session = get_db_session()
+    try:
+        return query(session)
+    finally:
+        session.close()
+
+def _to_cents(value: Any) -> int:
+    """Convert an amount to whole cents, rounded like a NUMERIC(15, 2) column"""
+    return int(safe_decimal(value).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP).scaleb(2))
+
+def _discard_scheduled_invalidations(session: Session, previous_transaction) -> None:
+    """Drop the cache invalidations of a rolled back transaction"""
+    if previous_transaction.nested:
+        return
+    session.info.pop('invalidate_namespaces', None)
+    session.info.pop('invalidate_patterns', None)
+
 class InvoiceService:
     """Core service for invoice operations"""
     
     def __init__(self, session: Session = None):
+        self._owns_session = session is None
         self.session = session or get_db_session()
-        self.invoice_logic = InvoiceBusinessLogic(self.session)
-        self.data_helper = DataHelper(self.session)
-        self.validation_helper = ValidationHelper(self.session)
-        self.settings_helper = SettingsHelper(self.session)
+        self._default_vat = None
+    
+    @classmethod
+    def for_thread(cls) -> 'InvoiceService':
+        """Get the calling thread's own service, which keeps its helpers across calls
+        
+        Closing it only releases the connection. Settings are re-read on each call,
+        so a changed default VAT is picked up.
+        """
+        service = getattr(_thread_local, 'invoice_service', None)
+        if service is None:
+            service = _thread_local.invoice_service = cls()
+        else:
+            service._forget_settings()
+        return service
+    
+    def _forget_settings(self) -> None:
+        """Drop cached settings so the next lookup reads them from the database"""
+        self._default_vat = None
+        self.__dict__.pop('settings_helper', None)
+    
+    # Helpers are built on first use; most calls only need one or two of them
+    
+    @cached_property
+    def invoice_logic(self) -> InvoiceBusinessLogic:
+        return InvoiceBusinessLogic(self.session)
+    
+    @cached_property
+    def data_helper(self) -> DataHelper:
+        return DataHelper(self.session)
+    
+    @cached_property
+    def validation_helper(self) -> ValidationHelper:
+        return ValidationHelper(self.session)
+    
+    @cached_property
+    def settings_helper(self) -> SettingsHelper:
+        return SettingsHelper(self.session)
     
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        # A session passed in belongs to the caller
+        if self.session and self._owns_session:
             self.session.close()
     
+    def _get_default_vat(self) -> Decimal:
+        """Default VAT percentage, read once per service instance or for_thread call"""
+        if self._default_vat is None:
+            self._default_vat = self.settings_helper.get_default_vat_percentage()
+        return self._default_vat
+    
+    def _schedule_invalidation(self, patterns: Iterable[str] = (),
+                               namespaces: Iterable[str] = ()) -> None:
+        """Invalidate caches when the session's current transaction commits"""
+        info = self.session.info
+        if not info.get('invalidation_hooks'):
+            event.listen(self.session, 'after_commit', _run_scheduled_invalidations)
+            event.listen(self.session, 'after_soft_rollback', _discard_scheduled_invalidations)
+            info['invalidation_hooks'] = True
+        
+        info.setdefault('invalidate_patterns', set()).update(patterns)
+        info.setdefault('invalidate_namespaces', set()).update(namespaces)
+    
     # ========== INVOICE CREATION ==========
     
     def create_invoice(self, invoice_data: Dict[str, Any], line_items: List[Dict[str, Any]], 
@@ -60,67 +156,17 @@ class InvoiceService:
         Returns:
             Tuple of (created_invoice, validation_result)
         """
-        validation_result = ValidationResult()
+        jobs = self._load_job_descriptions(line_items or [])
+        validation_result = self._validate_new_invoice(invoice_data, line_items, jobs)
+        if not validation_result.is_valid:
+            return None, validation_result
         
         try:
-            # Validate invoice data
-            invoice_validation = validate_invoice_data(invoice_data)
-            if not invoice_validation.is_valid:
-                validation_result.errors.extend(invoice_validation.errors)
-                return None, validation_result
-            
-            # Validate line items
-            if not line_items:
-                validation_result.add_error("Invoice must have at least one line item", "lines")
-                return None, validation_result
-            
-            for i, line_data in enumerate(line_items):
-                line_validation = validate_invoice_line_data(line_data)
-                if not line_validation.is_valid:
-                    for error in line_validation.errors:
-                        validation_result.add_error(
-                            f"Line {i+1}: {error['message']}", 
-                            f"line_{i}_{error['field']}"
-                        )
-            
-            if not validation_result.is_valid:
-                return None, validation_result
-            
-            # Create invoice
-            invoice = Invoice(
-                company_id=invoice_data['company_id'],
-                invoice_date=invoice_data.get('invoice_date', date.today()),
-                vat_percentage=invoice_data.get('vat_percentage', self.settings_helper.get_default_vat_percentage()),
-                status=invoice_data.get('status', 'draft'),
-                notes=invoice_data.get('notes', ''),
-                bank_account_id=invoice_data.get('bank_account_id'),
-                created_by=user_id
-            )
-            
-            # Generate invoice number if not provided
-            if not invoice_data.get('invoice_number'):
-                invoice.invoice_number = self.invoice_logic.generate_invoice_number(invoice.invoice_date)
-            else:
-                invoice.invoice_number = invoice_data['invoice_number']
-            
-            self.session.add(invoice)
-            self.session.flush()  # Get invoice ID
-            
-            # Add line items
-            for i, line_data in enumerate(line_items):
-                line = self._create_invoice_line(invoice.id, line_data, i + 1)
-                self.session.add(line)
-            
-            # Calculate totals
-            self.session.flush()  # Ensure lines are saved
-            self.session.refresh(invoice)  # Reload with lines
-            self.invoice_logic.update_invoice_totals(invoice)
-            
-            self.session.commit()
+            invoice = self._add_invoice(invoice_data, line_items, user_id, jobs)
             
             # Invalidate relevant caches
-            invalidate_cache("invoices:*")
-            invalidate_cache("invoice_stats:*")
+            self._schedule_invalidation(namespaces=["invoices"])
+            self.session.commit()
             
             logger.info(f"Created invoice {invoice.invoice_number} for company {invoice.company_id}")
             return invoice, validation_result
@@ -131,29 +177,244 @@ class InvoiceService:
             validation_result.add_error(f"Failed to create invoice: {str(e)}", "general")
             return None, validation_result
     
-    def _create_invoice_line(self, invoice_id: int, line_data: Dict[str, Any], line_order: int) -> InvoiceLine:
-        """Create individual invoice line"""
+    def create_invoices_bulk(self, batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]], 
+                             user_id: int) -> List[Tuple[Optional[int], ValidationResult]]:
+        """
+        Create several invoices in a single transaction
+        
+        The batch is written in one savepoint. If that fails, it is retried with a
+        savepoint per invoice, so a failing invoice is reported without discarding
+        the rest of the batch.
+        
+        Args:
+            batch: List of (invoice_data, line_items) pairs
+            user_id: User creating the invoices
+            
+        Returns:
+            List of (invoice_id, validation_result) in batch order; invoice_id is None on failure
+        """
+        results = []
+        valid = []
+        
+        # One job description query for the whole batch
+        jobs = self._load_job_descriptions(
+            [line_data for _, line_items in batch for line_data in line_items or []]
+        )
+        
+        for invoice_data, line_items in batch:
+            validation_result = self._validate_new_invoice(invoice_data, line_items, jobs)
+            results.append((None, validation_result))
+            if validation_result.is_valid:
+                valid.append((len(results) - 1, invoice_data, line_items))
+        
+        try:
+            with self.session.begin_nested():
+                created = [(index, self._add_invoice(invoice_data, line_items, user_id, jobs))
+                           for index, invoice_data, line_items in valid]
+        except Exception:
+            # Find the failing invoices one savepoint at a time
+            created = []
+            for index, invoice_data, line_items in valid:
+                try:
+                    with self.session.begin_nested():
+                        created.append((index, self._add_invoice(invoice_data, line_items, user_id, jobs)))
+                except Exception as e:
+                    logger.error(f"Error creating invoice: {e}")
+                    results[index][1].add_error(f"Failed to create invoice: {str(e)}", "general")
+        
+        for index, invoice in created:
+            results[index] = (invoice.id, results[index][1])
+        
+        # Invalidate relevant caches
+        self._schedule_invalidation(namespaces=["invoices"])
+        
+        try:
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error committing invoice batch: {e}")
+            for invoice_id, validation_result in results:
+                if invoice_id is not None:
+                    validation_result.add_error(f"Failed to create invoice: {str(e)}", "general")
+            return [(None, validation_result) for _, validation_result in results]
+        
+        logger.info(f"Created {sum(1 for invoice_id, _ in results if invoice_id)} invoices in bulk")
+        return results
+    
+    def _validate_new_invoice(self, invoice_data: Dict[str, Any], 
+                              line_items: List[Dict[str, Any]],
+                              jobs: Optional[Dict[int, Any]] = None) -> ValidationResult:
+        """Validate invoice header and line items before creation"""
+        validation_result = ValidationResult()
+        
+        # Validate invoice data
+        invoice_validation = validate_invoice_data(invoice_data)
+        if not invoice_validation.is_valid:
+            validation_result.errors.extend(invoice_validation.errors)
+            return validation_result
+        
+        # Validate line items
+        if not line_items:
+            validation_result.add_error("Invoice must have at least one line item", "lines")
+            return validation_result
+        
+        for i, line_data in enumerate(line_items):
+            line_validation = validate_invoice_line_data(line_data, jobs_map=jobs)
+            if not line_validation.is_valid:
+                for error in line_validation.errors:
+                    validation_result.add_error(
+                        f"Line {i+1}: {error['message']}", 
+                        f"line_{i}_{error['field']}"
+                    )
+        
+        return validation_result
+    
+    def _add_invoice(self, invoice_data: Dict[str, Any], line_items: List[Dict[str, Any]], 
+                     user_id: int, jobs: Optional[Dict[int, Any]] = None) -> Invoice:
+        """Add invoice and its lines to the session and compute totals (no commit)"""
+        invoice = self._add_invoice_header(invoice_data, user_id)
+        
+        # Add line items
+        subtotal = self._insert_invoice_lines(invoice.id, line_items, jobs)
+        
+        # Calculate totals from the inserted line totals; commit flushes them
+        self.invoice_logic.update_invoice_totals(invoice, subtotal)
+        
+        return invoice
+    
+    def _add_invoice_header(self, invoice_data: Dict[str, Any], user_id: int) -> Invoice:
+        """Add an invoice without lines to the session and flush it to get its ID"""
+        if 'vat_percentage' in invoice_data:
+            vat_percentage = invoice_data['vat_percentage']
+        else:
+            vat_percentage = self._get_default_vat()
+        
+        # Create invoice
+        invoice = Invoice(
+            company_id=invoice_data['company_id'],
+            invoice_date=invoice_data.get('invoice_date', date.today()),
+            vat_percentage=vat_percentage,
+            status=invoice_data.get('status', 'draft'),
+            notes=invoice_data.get('notes', ''),
+            bank_account_id=invoice_data.get('bank_account_id'),
+            created_by=user_id
+        )
+        
+        # Generate invoice number if not provided
+        if not invoice_data.get('invoice_number'):
+            invoice.invoice_number = self.invoice_logic.generate_invoice_number(invoice.invoice_date)
+        else:
+            invoice.invoice_number = invoice_data['invoice_number']
+        
+        self.session.add(invoice)
+        self.session.flush()  # Get invoice ID
+        
+        return invoice
+    
+    def _insert_invoice_lines(self, invoice_id: int, line_items: List[Dict[str, Any]],
+                              jobs: Optional[Dict[int, Any]] = None) -> Decimal:
+        """Insert the lines of an invoice with one multi-row INSERT and return their subtotal
+        
+        jobs may hold job descriptions already loaded by _load_job_descriptions.
+        """
+        if not line_items:
+            return Decimal('0')
+        
+        if jobs is None:
+            jobs = self._load_job_descriptions(line_items)
+        
+        subtotal = Decimal('0')
+        for start in range(0, len(line_items), LINE_INSERT_BATCH_SIZE):
+            rows = [
+                self._invoice_line_values(invoice_id, line_data, i + 1, jobs)
+                for i, line_data in enumerate(line_items[start:start + LINE_INSERT_BATCH_SIZE], start)
+            ]
+            self.session.execute(insert(InvoiceLine), rows)
+            
+            # Line totals are stored as NUMERIC(15, 2); sum them the way they will be read back
+            subtotal += sum(
+                (safe_decimal(row['line_total']).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP) for row in rows),
+                Decimal('0')
+            )
+        
+        return subtotal
+    
+    def _copy_invoice_lines(self, source_invoice_id: int, invoice_id: int) -> Decimal:
+        """Copy the lines of an invoice to another with one INSERT ... SELECT and return their subtotal
+        
+        Unit prices are resolved against the current job prices, as for new lines.
+        """
+        unit_price = func.coalesce(func.nullif(InvoiceLine.custom_price, 0), JobDescription.price)
+        quantity = func.coalesce(InvoiceLine.quantity, 1)
+        
+        self.session.execute(insert(InvoiceLine).from_select(
+            ['invoice_line_uuid', 'invoice_id', 'baris', 'line_order', 'tka_id', 'job_description_id',
+             'custom_job_name', 'custom_job_description', 'custom_price', 'quantity',
+             'unit_price', 'line_total'],
+            select(
+                # A Python-side uuid4 default would be evaluated once for every copied row
+                func.uuid_generate_v4(),
+                literal(invoice_id),
+                InvoiceLine.baris,
+                InvoiceLine.line_order,
+                InvoiceLine.tka_id,
+                InvoiceLine.job_description_id,
+                InvoiceLine.custom_job_name,
+                InvoiceLine.custom_job_description,
+                InvoiceLine.custom_price,
+                quantity,
+                unit_price,
+                unit_price * quantity
+            ).join(
+                JobDescription, InvoiceLine.job_description_id == JobDescription.id
+            ).where(InvoiceLine.invoice_id == source_invoice_id)
+        ))
+        
+        return safe_decimal(self.session.query(
+            func.coalesce(func.sum(InvoiceLine.line_total), 0)
+        ).filter(InvoiceLine.invoice_id == invoice_id).scalar())
+    
+    def _load_job_descriptions(self, line_items: List[Dict[str, Any]]) -> Dict[int, Any]:
+        """Fetch (id, price, job_name) of every job description used by the lines in one query
+        
+        Lines without a usable job_description_id are skipped; validation reports them.
+        """
+        ids = {safe_int(line_data.get('job_description_id')) for line_data in line_items}
+        ids.discard(None)
+        if not ids:
+            return {}
+        rows = self.session.query(
+            JobDescription.id, JobDescription.price, JobDescription.job_name
+        ).filter(JobDescription.id.in_(ids))
+        return {row.id: row for row in rows}
+    
+    def _invoice_line_values(self, invoice_id: int, line_data: Dict[str, Any], line_order: int,
+                             jobs: Dict[int, Any]) -> Dict[str, Any]:
+        """Build the column values of an individual invoice line"""
         # Get job description for default values
-        job_description = self.session.query(JobDescription).get(line_data['job_description_id'])
+        job_description_id = safe_int(line_data.get('job_description_id'))
+        job_description = jobs.get(job_description_id)
+        if job_description is None:
+            raise ValueError(f"Job description {line_data.get('job_description_id')} not found")
         
         # Calculate unit price (use custom price if provided, otherwise job price)
         unit_price = safe_decimal(line_data.get('custom_price') or job_description.price)
         quantity = int(line_data.get('quantity', 1))
         line_total = unit_price * quantity
         
-        return InvoiceLine(
-            invoice_id=invoice_id,
-            baris=line_data.get('baris', line_order),
-            line_order=line_order,
-            tka_id=line_data['tka_id'],
-            job_description_id=line_data['job_description_id'],
-            custom_job_name=line_data.get('custom_job_name'),
-            custom_job_description=line_data.get('custom_job_description'),
-            custom_price=line_data.get('custom_price'),
-            quantity=quantity,
-            unit_price=unit_price,
-            line_total=line_total
-        )
+        return {
+            'invoice_id': invoice_id,
+            'baris': line_data.get('baris', line_order),
+            'line_order': line_order,
+            'tka_id': line_data['tka_id'],
+            'job_description_id': job_description_id,
+            'custom_job_name': line_data.get('custom_job_name'),
+            'custom_job_description': line_data.get('custom_job_description'),
+            'custom_price': line_data.get('custom_price'),
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'line_total': line_total
+        }
     
     # ========== INVOICE EDITING ==========
     
@@ -199,9 +460,11 @@ class InvoiceService:
             
             # Update line items if provided
             if line_items is not None:
+                jobs = self._load_job_descriptions(line_items)
+                
                 # Validate line items
                 for i, line_data in enumerate(line_items):
-                    line_validation = validate_invoice_line_data(line_data)
+                    line_validation = validate_invoice_line_data(line_data, jobs_map=jobs)
                     if not line_validation.is_valid:
                         for error in line_validation.errors:
                             validation_result.add_error(
@@ -212,26 +475,24 @@ class InvoiceService:
                 if not validation_result.is_valid:
                     return None, validation_result
                 
-                # Remove existing lines
+                # Remove existing lines; the lines collection is reloaded below
+                # rather than kept in sync, which would cost a SELECT first
                 self.session.query(InvoiceLine).filter(
                     InvoiceLine.invoice_id == invoice_id
-                ).delete()
+                ).delete(synchronize_session=False)
                 
                 # Add new lines
-                for i, line_data in enumerate(line_items):
-                    line = self._create_invoice_line(invoice_id, line_data, i + 1)
-                    self.session.add(line)
+                subtotal = self._insert_invoice_lines(invoice_id, line_items, jobs)
+                self.session.expire(invoice, ['lines'])
+            else:
+                subtotal = None  # Lines unchanged; totals are read from the stored lines
             
             # Recalculate totals
-            self.session.flush()
-            self.session.refresh(invoice)
-            self.invoice_logic.update_invoice_totals(invoice)
-            
-            self.session.commit()
+            self.invoice_logic.update_invoice_totals(invoice, subtotal)
             
             # Invalidate caches
-            invalidate_cache(f"invoice:{invoice_id}")
-            invalidate_cache("invoices:*")
+            self._schedule_invalidation([f"invoice:{invoice_id}"], ["invoices"])
+            self.session.commit()
             
             logger.info(f"Updated invoice {invoice.invoice_number}")
             return invoice, validation_result
@@ -263,11 +524,9 @@ class InvoiceService:
             old_status = invoice.status
             invoice.status = new_status
             
-            self.session.commit()
-            
             # Invalidate caches
-            invalidate_cache(f"invoice:{invoice_id}")
-            invalidate_cache("invoices:*")
+            self._schedule_invalidation([f"invoice:{invoice_id}"], ["invoices"])
+            self.session.commit()
             
             logger.info(f"Changed invoice {invoice.invoice_number} status from {old_status} to {new_status}")
             return invoice, validation_result
@@ -302,11 +561,10 @@ class InvoiceService:
             
             # Delete invoice (cascade will delete lines)
             self.session.delete(invoice)
-            self.session.commit()
             
             # Invalidate caches
-            invalidate_cache(f"invoice:{invoice_id}")
-            invalidate_cache("invoices:*")
+            self._schedule_invalidation([f"invoice:{invoice_id}"], ["invoices"])
+            self.session.commit()
             
             logger.info(f"Deleted invoice {invoice_number}")
             
@@ -322,7 +580,141 @@ class InvoiceService:
     @cached("invoice", ttl=1800)
     def get_invoice(self, invoice_id: int) -> Optional[Invoice]:
         """Get invoice by ID"""
-        return self.session.query(Invoice).get(invoice_id)
+        return self.session.query(Invoice).options(
+            joinedload(Invoice.company)
+        ).get(invoice_id)
+    
+    def get_invoice_quick_row(self, invoice_id: int) -> Optional[Tuple]:
+        """Get summary columns of an invoice without loading the full object
+        
+        Row: (id, invoice_number, company_name, total_amount, status, invoice_date).
+        """
+        return self.session.query(
+            Invoice.id,
+            Invoice.invoice_number,
+            Company.company_name,
+            Invoice.total_amount,
+            Invoice.status,
+            Invoice.invoice_date
+        ).join(Company, Invoice.company_id == Company.id).filter(
+            Invoice.id == invoice_id
+        ).first()
+    
+    def get_invoices_bulk(self, invoice_ids: List[int]) -> List[Invoice]:
+        """Get multiple invoices with related data eagerly loaded, in the given ID order"""
+        if not invoice_ids:
+            return []
+        
+        invoices = self.session.query(Invoice).options(
+            joinedload(Invoice.company),
+            joinedload(Invoice.creator),
+            joinedload(Invoice.bank_account),
+            selectinload(Invoice.lines).selectinload(InvoiceLine.tka_worker),
+            selectinload(Invoice.lines).selectinload(InvoiceLine.job_description)
+        ).filter(Invoice.id.in_(invoice_ids)).all()
+        
+        invoices_by_id = {invoice.id: invoice for invoice in invoices}
+        return [invoices_by_id[invoice_id] for invoice_id in invoice_ids if invoice_id in invoices_by_id]
+    
+    def _export_invoice_query(self):
+        """Statement for flat invoice export rows, led by Invoice.id
+        
+        Row: (id, invoice_number, invoice_date, company_name, npwp, status,
+        subtotal, vat_amount, total_amount, creator_name, created_at).
+        Amounts are cast to float in SQL so the export does not convert Decimals per cell.
+        """
+        return lambda_stmt(lambda: select(
+            Invoice.id,
+            Invoice.invoice_number,
+            Invoice.invoice_date,
+            Company.company_name,
+            Company.npwp,
+            Invoice.status,
+            cast(Invoice.subtotal, Float),
+            cast(Invoice.vat_amount, Float),
+            cast(Invoice.total_amount, Float),
+            User.full_name,
+            Invoice.created_at
+        ).join(Company, Invoice.company_id == Company.id).join(
+            User, Invoice.created_by == User.id
+        ))
+    
+    def _export_line_query(self):
+        """Statement for flat invoice line export rows, led by InvoiceLine.invoice_id
+        
+        Row: (invoice_id, invoice_number, baris, tka_name, custom_job_name, job_name,
+        custom_job_description, job_description, quantity, unit_price, line_total).
+        """
+        return lambda_stmt(lambda: select(
+            InvoiceLine.invoice_id,
+            Invoice.invoice_number,
+            InvoiceLine.baris,
+            TkaWorker.nama,
+            InvoiceLine.custom_job_name,
+            JobDescription.job_name,
+            InvoiceLine.custom_job_description,
+            JobDescription.job_description,
+            InvoiceLine.quantity,
+            cast(InvoiceLine.unit_price, Float),
+            cast(InvoiceLine.line_total, Float)
+        ).join(Invoice, InvoiceLine.invoice_id == Invoice.id).join(
+            Company, Invoice.company_id == Company.id
+        ).outerjoin(
+            TkaWorker, InvoiceLine.tka_id == TkaWorker.id
+        ).outerjoin(
+            JobDescription, InvoiceLine.job_description_id == JobDescription.id
+        ))
+    
+    def get_invoices_for_export(self, invoice_ids: List[int]) -> Dict[str, List[Tuple]]:
+        """Get flat invoice and line rows for spreadsheet export, in the given ID order
+        
+        See _export_invoice_query and _export_line_query for the row layouts
+        (returned without the leading ID column).
+        """
+        if not invoice_ids:
+            return {'invoices': [], 'lines': []}
+        
+        position = {invoice_id: index for index, invoice_id in enumerate(invoice_ids)}
+        
+        invoice_stmt = self._export_invoice_query()
+        invoice_stmt += lambda s: s.where(Invoice.id.in_(invoice_ids))
+        line_stmt = self._export_line_query()
+        line_stmt += lambda s: s.where(
+            InvoiceLine.invoice_id.in_(invoice_ids)
+        ).order_by(InvoiceLine.invoice_id, InvoiceLine.line_order)
+        
+        invoice_rows = self.session.execute(invoice_stmt).all()
+        line_rows = self.session.execute(line_stmt).all()
+        
+        # Sort is stable, so lines keep their line order within each invoice
+        invoice_rows.sort(key=lambda row: position[row[0]])
+        line_rows.sort(key=lambda row: position[row[0]])
+        
+        return {
+            'invoices': [tuple(row[1:]) for row in invoice_rows],
+            'lines': [tuple(row[1:]) for row in line_rows]
+        }
+    
+    def iter_invoices_for_export(self, filters: Dict[str, Any] = None,
+                                 chunk_size: int = 500) -> Iterator[Tuple]:
+        """Stream flat invoice export rows matching filters, newest first
+        
+        Rows are fetched chunk_size at a time, so memory stays flat however many match.
+        """
+        stmt = self._apply_invoice_filters(self._export_invoice_query(), filters)
+        stmt += lambda s: s.order_by(desc(Invoice.invoice_date), desc(Invoice.created_at), Invoice.id)
+        for row in self.session.execute(stmt, execution_options={'yield_per': chunk_size}):
+            yield tuple(row[1:])
+    
+    def iter_invoice_lines_for_export(self, filters: Dict[str, Any] = None,
+                                      chunk_size: int = 500) -> Iterator[Tuple]:
+        """Stream flat invoice line export rows matching filters, in invoice export order"""
+        stmt = self._apply_invoice_filters(self._export_line_query(), filters)
+        stmt += lambda s: s.order_by(
+            desc(Invoice.invoice_date), desc(Invoice.created_at), Invoice.id, InvoiceLine.line_order
+        )
+        for row in self.session.execute(stmt, execution_options={'yield_per': chunk_size}):
+            yield tuple(row[1:])
     
     def get_invoice_by_number(self, invoice_number: str) -> Optional[Invoice]:
         """Get invoice by number"""
@@ -330,56 +722,146 @@ class InvoiceService:
             Invoice.invoice_number == invoice_number
         ).first()
     
-    @cached("invoices_list", ttl=900)
+    @cached("invoices_list", ttl=900, namespace="invoices")
     def get_invoices_list(self, page: int = 1, per_page: int = 50, 
-                         filters: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Get paginated invoices list with filters"""
-        query = self.session.query(Invoice).join(Company)
+                         filters: Dict[str, Any] = None,
+                         after: Optional[Tuple[date, datetime, int]] = None) -> Dict[str, Any]:
+        """Get paginated invoices list with filters
+        
+        Pass the previous result's next_cursor as after to seek straight to the
+        next page instead of skipping rows with OFFSET; total then counts the
+        matches from that page on.
+        """
+        # Only the columns the list shows, so no ORM objects are built just to be
+        # serialized; total rides along as a window count instead of a separate COUNT query
+        stmt = lambda_stmt(lambda: select(
+            Invoice.id,
+            Invoice.invoice_number,
+            Invoice.company_id,
+            Invoice.invoice_date,
+            Invoice.subtotal,
+            Invoice.vat_percentage,
+            Invoice.vat_amount,
+            Invoice.total_amount,
+            Invoice.status,
+            Invoice.notes,
+            Invoice.printed_count,
+            Invoice.created_at,
+            Company.company_name,
+            User.full_name.label('creator_name'),
+            select(func.count(InvoiceLine.id)).where(
+                InvoiceLine.invoice_id == Invoice.id
+            ).correlate(Invoice).scalar_subquery().label('line_count'),
+            func.count().over().label('_total')
+        ).join(Company).outerjoin(User, Invoice.created_by == User.id))
         
         # Apply filters
-        if filters:
-            if filters.get('company_id'):
-                query = query.filter(Invoice.company_id == filters['company_id'])
-            
-            if filters.get('status'):
-                query = query.filter(Invoice.status == filters['status'])
-            
-            if filters.get('start_date'):
-                query = query.filter(Invoice.invoice_date >= filters['start_date'])
-            
-            if filters.get('end_date'):
-                query = query.filter(Invoice.invoice_date <= filters['end_date'])
-            
-            if filters.get('search'):
-                search_term = f"%{filters['search']}%"
-                query = query.filter(
-                    or_(
-                        Invoice.invoice_number.ilike(search_term),
-                        Company.company_name.ilike(search_term),
-                        Company.npwp.like(search_term)
-                    )
-                )
+        stmt = self._apply_invoice_filters(stmt, filters)
         
-        # Count total
-        total = query.count()
+        stmt += lambda s: s.order_by(
+            desc(Invoice.invoice_date), desc(Invoice.created_at), desc(Invoice.id)
+        )
         
         # Apply pagination
-        offset = (page - 1) * per_page
-        invoices = query.order_by(
-            desc(Invoice.invoice_date), desc(Invoice.created_at)
-        ).offset(offset).limit(per_page).all()
+        if after:
+            after_date, after_created_at, after_id = after
+            stmt += lambda s: s.where(
+                tuple_(Invoice.invoice_date, Invoice.created_at, Invoice.id)
+                < tuple_(after_date, after_created_at, after_id)
+            )
+        else:
+            offset = (page - 1) * per_page
+            stmt += lambda s: s.offset(offset)
+        stmt += lambda s: s.limit(per_page)
+        
+        rows = self.session.execute(stmt).all()
+        
+        if rows:
+            total = rows[0]._total
+        elif page > 1 and not after:
+            # Paged past the end, so no row carries the window count
+            count_stmt = self._apply_invoice_filters(
+                lambda_stmt(lambda: select(func.count(Invoice.id)).join(Company)), filters
+            )
+            total = self.session.execute(count_stmt).scalar()
+        else:
+            total = 0
+        
+        last = rows[-1] if len(rows) == per_page else None
         
         return {
-            'invoices': [invoice.to_dict() for invoice in invoices],
+            'invoices': [self._invoice_list_item(row) for row in rows],
             'total': total,
             'page': page,
             'per_page': per_page,
-            'pages': (total + per_page - 1) // per_page
+            'pages': (total + per_page - 1) // per_page,
+            'next_cursor': (last.invoice_date, last.created_at, last.id) if last else None
+        }
+    
+    @staticmethod
+    def _invoice_list_item(row) -> Dict[str, Any]:
+        """Build an invoice list entry from a get_invoices_list row, keyed like Invoice.to_dict()"""
+        return {
+            'id': row.id,
+            'invoice_number': row.invoice_number,
+            'company_id': row.company_id,
+            'invoice_date': row.invoice_date.isoformat() if row.invoice_date else None,
+            'subtotal': float(row.subtotal or 0),
+            'vat_percentage': float(row.vat_percentage or 0),
+            'vat_amount': float(row.vat_amount or 0),
+            'total_amount': float(row.total_amount or 0),
+            'status': row.status,
+            'notes': row.notes,
+            'printed_count': row.printed_count,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'company_name': row.company_name,
+            'creator_name': row.creator_name,
+            'line_count': row.line_count
         }
     
+    def _apply_invoice_filters(self, stmt, filters: Dict[str, Any] = None):
+        """Append invoice list filters to a lambda statement that already joins Company
+        
+        Each filter is its own lambda with its value bound as a parameter, so
+        SQLAlchemy compiles every filter combination once and reuses the SQL.
+        """
+        if not filters:
+            return stmt
+        
+        if filters.get('company_id'):
+            company_id = filters['company_id']
+            stmt += lambda s: s.where(Invoice.company_id == company_id)
+        
+        if filters.get('status'):
+            status = filters['status']
+            stmt += lambda s: s.where(Invoice.status == status)
+        
+        if filters.get('start_date'):
+            start_date = filters['start_date']
+            stmt += lambda s: s.where(Invoice.invoice_date >= start_date)
+        
+        if filters.get('end_date'):
+            end_date = filters['end_date']
+            stmt += lambda s: s.where(Invoice.invoice_date <= end_date)
+        
+        if filters.get('search'):
+            # Leading-wildcard matches are served by the pg_trgm indexes in database.sql
+            search_term = f"%{filters['search']}%"
+            stmt += lambda s: s.where(
+                or_(
+                    Invoice.invoice_number.ilike(search_term),
+                    Company.company_name.ilike(search_term),
+                    Company.npwp.like(search_term)
+                )
+            )
+        
+        return stmt
+    
     def get_recent_invoices(self, limit: int = 10) -> List[Invoice]:
         """Get recent invoices"""
-        return self.session.query(Invoice).order_by(
+        return self.session.query(Invoice).options(
+            joinedload(Invoice.company)
+        ).order_by(
             desc(Invoice.created_at)
         ).limit(limit).all()
     
@@ -405,29 +887,24 @@ class InvoiceService:
                 'bank_account_id': original.bank_account_id
             }
             
-            # Prepare line items
-            line_items = []
-            for line in original.lines:
-                line_data = {
-                    'tka_id': line.tka_id,
-                    'job_description_id': line.job_description_id,
-                    'custom_job_name': line.custom_job_name,
-                    'custom_job_description': line.custom_job_description,
-                    'custom_price': line.custom_price,
-                    'quantity': line.quantity,
-                    'baris': line.baris
-                }
-                line_items.append(line_data)
+            invoice_validation = validate_invoice_data(invoice_data)
+            if not invoice_validation.is_valid:
+                validation_result.errors.extend(invoice_validation.errors)
+                return None, validation_result
             
-            # Create new invoice
-            new_invoice, result = self.create_invoice(invoice_data, line_items, user_id)
+            # Create new invoice and copy the lines in the database
+            new_invoice = self._add_invoice_header(invoice_data, user_id)
+            subtotal = self._copy_invoice_lines(original.id, new_invoice.id)
+            self.invoice_logic.update_invoice_totals(new_invoice, subtotal)
             
-            if result.is_valid:
-                logger.info(f"Cloned invoice {original.invoice_number} to {new_invoice.invoice_number}")
+            self._schedule_invalidation(namespaces=["invoices"])
+            self.session.commit()
             
-            return new_invoice, result
+            logger.info(f"Cloned invoice {original.invoice_number} to {new_invoice.invoice_number}")
+            return new_invoice, validation_result
             
         except Exception as e:
+            self.session.rollback()
             logger.error(f"Error cloning invoice {invoice_id}: {e}")
             validation_result.add_error(f"Failed to clone invoice: {str(e)}", "general")
             return None, validation_result
@@ -435,15 +912,18 @@ class InvoiceService:
     def mark_invoice_printed(self, invoice_id: int) -> None:
         """Mark invoice as printed"""
         try:
-            invoice = self.session.query(Invoice).get(invoice_id)
-            if invoice:
-                invoice.printed_count += 1
-                invoice.last_printed_at = datetime.now()
-                self.session.commit()
-                
+            # Increment in SQL, so concurrent prints are not lost
+            updated = self.session.query(Invoice).filter(Invoice.id == invoice_id).update({
+                Invoice.printed_count: func.coalesce(Invoice.printed_count, 0) + 1,
+                Invoice.last_printed_at: datetime.now()
+            }, synchronize_session=False)
+            
+            if updated:
                 # Invalidate cache
-                invalidate_cache(f"invoice:{invoice_id}")
-                
+                self._schedule_invalidation([f"invoice:{invoice_id}"])
+            
+            self.session.commit()
+            
         except Exception as e:
             self.session.rollback()
             logger.error(f"Error marking invoice as printed: {e}")
@@ -454,31 +934,37 @@ class InvoiceService:
                                 vat_percentage: Decimal = None) -> Dict[str, Any]:
         """Calculate invoice totals without saving"""
         if vat_percentage is None:
-            vat_percentage = self.settings_helper.get_default_vat_percentage()
+            vat_percentage = self._get_default_vat()
         
-        subtotal = Decimal('0')
+        # Amounts are summed as integer cents and turned into Decimals once per value
+        subtotal_cents = 0
         lines_preview = []
+        jobs = self._load_job_descriptions(line_items)
+        job_price_cents = {job_id: _to_cents(job.price) for job_id, job in jobs.items()}
         
         for line_data in line_items:
             # Get job description
-            job = self.session.query(JobDescription).get(line_data['job_description_id'])
+            job = jobs.get(safe_int(line_data.get('job_description_id')))
             if not job:
                 continue
             
             # Calculate line total
-            unit_price = safe_decimal(line_data.get('custom_price') or job.price)
+            custom_price = line_data.get('custom_price')
+            price_cents = _to_cents(custom_price) if custom_price else job_price_cents[job.id]
             quantity = int(line_data.get('quantity', 1))
-            line_total = unit_price * quantity
+            line_cents = price_cents * quantity
             
-            subtotal += line_total
+            subtotal_cents += line_cents
             
             lines_preview.append({
-                'unit_price': unit_price,
+                'unit_price': Decimal(price_cents).scaleb(-2),
                 'quantity': quantity,
-                'line_total': line_total,
+                'line_total': Decimal(line_cents).scaleb(-2),
                 'job_name': line_data.get('custom_job_name') or job.job_name
             })
         
+        subtotal = Decimal(subtotal_cents).scaleb(-2)
+        
         # Calculate VAT and total
         vat_amount = self.invoice_logic.calculate_vat_amount(subtotal, vat_percentage)
         total_amount = subtotal + vat_amount
@@ -498,41 +984,64 @@ class InvoiceService:
     
     # ========== STATISTICS ==========
     
-    @cached("invoice_stats", ttl=3600)
+    @cached("invoice_stats", ttl=3600, namespace="invoices")
     def get_invoice_statistics(self) -> Dict[str, Any]:
         """Get invoice statistics"""
-        # Status counts
-        status_counts = self.session.query(
-            Invoice.status, func.count(Invoice.id)
-        ).group_by(Invoice.status).all()
-        
-        # Total amounts by status
-        status_amounts = self.session.query(
-            Invoice.status, func.sum(Invoice.total_amount)
-        ).group_by(Invoice.status).all()
-        
-        # Monthly totals (current year)
+        today_start = datetime.now().replace(hour=0, minute=0, second=0)
         current_year = date.today().year
-        monthly_totals = self.session.query(
-            func.extract('month', Invoice.invoice_date).label('month'),
-            func.sum(Invoice.total_amount).label('total')
-        ).filter(
-            func.extract('year', Invoice.invoice_date) == current_year
-        ).group_by(func.extract('month', Invoice.invoice_date)).all()
         
-        # Recent activity
-        recent_count = self.session.query(Invoice).filter(
-            Invoice.created_at >= datetime.now().replace(hour=0, minute=0, second=0)
-        ).count()
+        status_future = _statistics_executor.submit(
+            _in_own_session, lambda session: self._query_status_statistics(session, today_start)
+        )
+        monthly_future = _statistics_executor.submit(
+            _in_own_session, lambda session: self._query_monthly_totals(session, current_year)
+        )
+        status_rows = status_future.result()
+        monthly_totals = monthly_future.result()
+        
+        status_counts = {}
+        status_amounts = {}
+        recent_count = 0
+        for status, count, amount, recent in status_rows:
+            status_counts[status] = count
+            status_amounts[status] = float(amount or 0)
+            recent_count += recent
         
         return {
-            'status_counts': dict(status_counts),
-            'status_amounts': {status: float(amount or 0) for status, amount in status_amounts},
+            'status_counts': status_counts,
+            'status_amounts': status_amounts,
             'monthly_totals': {int(month): float(total or 0) for month, total in monthly_totals},
             'recent_count': recent_count,
-            'total_invoices': sum(count for _, count in status_counts)
+            'total_invoices': sum(status_counts.values())
         }
     
+    @staticmethod
+    def _query_status_statistics(session: Session, today_start: datetime) -> List[Tuple]:
+        """Status counts, amounts and today's activity in one pass
+        
+        Row: (status, count, total_amount, created_since_today_start).
+        """
+        return session.query(
+            Invoice.status,
+            func.count(Invoice.id),
+            func.sum(Invoice.total_amount),
+            func.count(Invoice.id).filter(Invoice.created_at >= today_start)
+        ).group_by(Invoice.status).all()
+    
+    @staticmethod
+    def _query_monthly_totals(session: Session, year: int) -> List[Tuple]:
+        """Invoice totals per month of year, as (month, total) rows
+        
+        Filters on a date range so an invoice_date index applies.
+        """
+        return session.query(
+            func.extract('month', Invoice.invoice_date).label('month'),
+            func.sum(Invoice.total_amount).label('total')
+        ).filter(
+            Invoice.invoice_date >= date(year, 1, 1),
+            Invoice.invoice_date < date(year + 1, 1, 1)
+        ).group_by(func.extract('month', Invoice.invoice_date)).all()
+    
     # ========== SEARCH ==========
     
     def search_invoices(self, query: str, limit: int = 50) -> List[Invoice]:
@@ -540,15 +1049,15 @@ class InvoiceService:
         if not query:
             return self.get_recent_invoices(limit)
         
-        return self.session.query(Invoice).join(Company).filter(
-            or_(
-                Invoice.invoice_number.ilike(f'%{query}%'),
-                Company.company_name.ilike(f'%{query}%'),
-                Company.npwp.like(f'%{query}%')
-            )
-        ).order_by(
+        stmt = lambda_stmt(lambda: select(Invoice).join(Company).options(
+            contains_eager(Invoice.company)
+        ))
+        stmt = self._apply_invoice_filters(stmt, {'search': query})
+        stmt += lambda s: s.order_by(
             desc(Invoice.invoice_date), desc(Invoice.created_at)
-        ).limit(limit).all()
+        ).limit(limit)
+        
+        return self.session.execute(stmt).scalars().all()
 
 # Utility functions for external use
 def create_invoice_service() -> InvoiceService:
@@ -557,17 +1066,18 @@ def create_invoice_service() -> InvoiceService:
 
 def get_invoice_quick_info(invoice_id: int) -> Optional[Dict[str, Any]]:
     """Get quick invoice information"""
-    with create_invoice_service() as service:
-        invoice = service.get_invoice(invoice_id)
-        if invoice:
+    with InvoiceService.for_thread() as service:
+        row = service.get_invoice_quick_row(invoice_id)
+        if row:
+            invoice_id, invoice_number, company_name, total_amount, status, invoice_date = row
             return {
-                'id': invoice.id,
-                'invoice_number': invoice.invoice_number,
-                'company_name': invoice.company.company_name,
-                'total_amount': float(invoice.total_amount),
-                'status': invoice.status,
-                'invoice_date': format_date_short(invoice.invoice_date),
-                'formatted_total': format_currency_idr(invoice.total_amount)
+                'id': invoice_id,
+                'invoice_number': invoice_number,
+                'company_name': company_name,
+                'total_amount': float(total_amount),
+                'status': status,
+                'invoice_date': format_date_short(invoice_date),
+                'formatted_total': format_currency_idr(total_amount)
             }
         return None
 
@@ -1,147 +1,122 @@
 #!/usr/bin/env python3
 """
 Invoice Management System - Setup and Installation Script
-Setup script for packaging and distributing the Invoice Management System.
+Build shim for the metadata in pyproject.toml plus the post-install hook.
 """
 
 import os
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-from setuptools import setup, find_packages
+from setuptools import setup
+
+# Splits a requirement line at its first version specifier
+_VERSION_SPECIFIER = re.compile(r"[<>=!~]=?")
+
+# The AppConfig.version default in config.py
+_CONFIG_VERSION = re.compile(r'\bversion:\s*str\s*=\s*Field\(\s*default="([^"]+)"')
 
 # Read version from config
+@lru_cache(maxsize=1)
 def get_version():
-    """Get version from config file"""
+    """Get version from config file
+    
+    The default is read from the source rather than importing config, which
+    would load pydantic and the whole settings tree just for this string.
+    """
+    config_file = Path(__file__).parent / "config.py"
     try:
-        # Add current directory to path
-        sys.path.insert(0, str(Path(__file__).parent))
-        from config import app_config
-        return app_config.version
-    except ImportError:
+        match = _CONFIG_VERSION.search(config_file.read_text(encoding="utf-8"))
+    except OSError:
         return "1.0.0"
-
-# Read README file
-def get_long_description():
-    """Get long description from README file"""
-    readme_file = Path(__file__).parent / "README.md"
-    if readme_file.exists():
-        with open(readme_file, "r", encoding="utf-8") as f:
-            return f.read()
-    return ""
+    return match.group(1) if match else "1.0.0"
 
 # Read requirements
+@lru_cache(maxsize=1)
 def get_requirements():
     """Get requirements from requirements.txt"""
     requirements_file = Path(__file__).parent / "requirements.txt"
     if requirements_file.exists():
-        with open(requirements_file, "r", encoding="utf-8") as f:
-            requirements = []
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    # Remove version pinning for setup.py
-                    package = line.split("==")[0].split(">=")[0].split("<=")[0]
-                    requirements.append(package)
-            return requirements
+        lines = requirements_file.read_text(encoding="utf-8").splitlines()
+        # Remove version pinning for setup.py
+        return [
+            _VERSION_SPECIFIER.split(line, 1)[0].strip()
+            for line in lines
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
     return []
 
-# Development requirements
-dev_requirements = [
-    "pytest>=7.4.0",
-    "pytest-qt>=4.2.0",
-    "black>=23.0.0",
-    "flake8>=6.0.0",
-    "mypy>=1.5.0",
-    "sphinx>=7.0.0",
-    "sphinx-rtd-theme>=1.3.0",
-    "coverage>=7.3.0",
-    "pre-commit>=3.4.0",
-]
+# Marks a completed post-install so repeat installs skip it
+POST_INSTALL_SENTINEL = Path.home() / ".cache/invoice-manager/.post_install_done"
 
-setup(
-    # Basic package information
-    name="invoice-management-system",
-    version=get_version(),
-    description="Professional Invoice Management System for TKA Services",
-    long_description=get_long_description(),
-    long_description_content_type="text/markdown",
-    
-    # Author information
-    author="Invoice Management System Team",
-    author_email="admin@invoice-system.com",
-    url="https://github.com/your-org/invoice-management-system",
-    
-    # Package configuration
-    packages=find_packages(exclude=["tests", "tests.*", "docs", "docs.*"]),
-    package_data={
-        "ui": ["*.qss"],
-        "assets": ["icons/*", "templates/*"],
-        "": ["*.sql", "*.env.example"],
-    },
-    include_package_data=True,
-    
-    # Dependencies
-    install_requires=get_requirements(),
-    extras_require={
-        "dev": dev_requirements,
-        "test": [
-            "pytest>=7.4.0",
-            "pytest-qt>=4.2.0",
-            "coverage>=7.3.0",
-        ],
-        "docs": [
-            "sphinx>=7.0.0",
-            "sphinx-rtd-theme>=1.3.0",
-        ],
-    },
-    
-    # Python version requirement
-    python_requires=">=3.8",
-    
-    # Entry points
-    entry_points={
-        "console_scripts": [
-            "invoice-manager=main:main",
-        ],
-        "gui_scripts": [
-            "invoice-manager-gui=main:main",
-        ],
-    },
-    
-    # Classification
-    classifiers=[
-        "Development Status :: 4 - Beta",
-        "Intended Audience :: End Users/Desktop",
-        "Intended Audience :: Financial and Insurance Industry",
-        "License :: OSI Approved :: MIT License",
-        "Operating System :: OS Independent",
-        "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10",
-        "Programming Language :: Python :: 3.11",
-        "Programming Language :: Python :: 3.12",
-        "Topic :: Office/Business :: Financial :: Accounting",
-        "Topic :: Office/Business :: Financial :: Point-Of-Sale",
-        "Environment :: X11 Applications :: Qt",
-    ],
-    
-    # Keywords
-    keywords="invoice management accounting business TKA services",
-    
-    # License
-    license="MIT",
-    
-    # Project URLs
-    project_urls={
-        "Bug Reports": "https://github.com/your-org/invoice-management-system/issues",
-        "Source": "https://github.com/your-org/invoice-management-system",
-        "Documentation": "https://invoice-management-system.readthedocs.io/",
-    },
+# Linux desktop entry contents
+DESKTOP_ENTRY = b"""[Desktop Entry]
+Name=Invoice Management System
+Comment=Professional Invoice Management System for TKA Services
+Exec=invoice-manager-gui
+Icon=invoice-manager
+Terminal=false
+Type=Application
+Categories=Office;Finance;
+"""
+
+# Sample .env template
+ENV_EXAMPLE = b"""# Invoice Management System - Configuration Template
+# Copy this file to .env and modify the values
+
+# Database Configuration
+DB_HOST=localhost
+DB_PORT=5432
+DB_NAME=invoice_management
+DB_USER=postgres
+DB_PASSWORD=your_password_here
+
+# Application Configuration
+APP_NAME=Invoice Management System
+DEBUG_MODE=False
+SECRET_KEY=change-this-secret-key
+
+# UI Configuration
+DEFAULT_THEME=light
+HIGH_DPI_SCALING=True
+
+# Business Configuration
+DEFAULT_VAT_PERCENTAGE=11.00
+COMPANY_TAGLINE=Spirit of Services
+"""
+
+def _write_if_changed(path, content):
+    """Atomically write bytes to path unless it already holds exactly that content"""
+    try:
+        if path.read_bytes() == content:
+            return False
+    except OSError:
+        pass
     
-    # ZIP safe
-    zip_safe=False,
-)
+    tmp_path = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, content)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+    return True
+
+def _post_install_done():
+    """Check whether post-install already ran against this setup.py"""
+    try:
+        return POST_INSTALL_SENTINEL.stat().st_mtime >= Path(__file__).stat().st_mtime
+    except OSError:
+        return False
+
+def _should_setup_database():
+    """Decide on database setup without blocking non-interactive installs"""
+    if os.environ.get("INVOICE_SETUP_DB", "").lower() in ("1", "y", "yes", "true"):
+        return True
+    if not sys.stdin or not sys.stdin.isatty():
+        return False
+    return input("\nSetup database now? (y/N): ").lower().strip() == 'y'
 
 # Custom commands
 class CustomCommands:
@@ -151,23 +126,13 @@ class CustomCommands:
     def create_desktop_entry():
         """Create desktop entry for Linux systems"""
         if sys.platform.startswith('linux'):
-            desktop_entry = """[Desktop Entry]
-Name=Invoice Management System
-Comment=Professional Invoice Management System for TKA Services
-Exec=invoice-manager-gui
-Icon=invoice-manager
-Terminal=false
-Type=Application
-Categories=Office;Finance;
-"""
             try:
                 desktop_dir = Path.home() / ".local/share/applications"
                 desktop_dir.mkdir(parents=True, exist_ok=True)
                 
                 desktop_file = desktop_dir / "invoice-manager.desktop"
-                desktop_file.write_text(desktop_entry)
-                
-                print(f"✅ Desktop entry created: {desktop_file}")
+                if _write_if_changed(desktop_file, DESKTOP_ENTRY):
+                    print(f"✅ Desktop entry created: {desktop_file}")
             except Exception as e:
                 print(f"⚠️  Failed to create desktop entry: {e}")
     
@@ -188,31 +153,7 @@ Categories=Office;Finance;
         try:
             # Create .env.example
             env_example = Path(".env.example")
-            if not env_example.exists():
-                env_content = """# Invoice Management System - Configuration Template
-# Copy this file to .env and modify the values
-
-# Database Configuration
-DB_HOST=localhost
-DB_PORT=5432
-DB_NAME=invoice_management
-DB_USER=postgres
-DB_PASSWORD=your_password_here
-
-# Application Configuration
-APP_NAME=Invoice Management System
-DEBUG_MODE=False
-SECRET_KEY=change-this-secret-key
-
-# UI Configuration
-DEFAULT_THEME=light
-HIGH_DPI_SCALING=True
-
-# Business Configuration
-DEFAULT_VAT_PERCENTAGE=11.00
-COMPANY_TAGLINE=Spirit of Services
-"""
-                env_example.write_text(env_content)
+            if _write_if_changed(env_example, ENV_EXAMPLE):
                 print(f"✅ Sample configuration created: {env_example}")
             
         except Exception as e:
@@ -220,6 +161,9 @@ COMPANY_TAGLINE=Spirit of Services
 
 def post_install():
     """Post-installation tasks"""
+    if _post_install_done():
+        return
+    
     print("\n" + "="*50)
     print("Invoice Management System - Post-Installation Setup")
     print("="*50)
@@ -232,11 +176,16 @@ def post_install():
     # Create desktop entry (Linux only)
     commands.create_desktop_entry()
     
-    # Setup database (optional)
-    setup_db = input("\nSetup database now? (y/N): ").lower().strip()
-    if setup_db == 'y':
+    # Setup database (optional, INVOICE_SETUP_DB=1 for unattended installs)
+    if _should_setup_database():
         commands.setup_database()
     
+    try:
+        POST_INSTALL_SENTINEL.parent.mkdir(parents=True, exist_ok=True)
+        POST_INSTALL_SENTINEL.touch()
+    except OSError:
+        pass
+    
     print("\n" + "="*50)
     print("Installation completed!")
     print("="*50)
@@ -252,8 +201,11 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "post_install":
         post_install()
     else:
-        # Normal setup
-        setup()
+        # Static metadata lives in pyproject.toml; only the dynamic fields are set here
+        setup(
+            version=get_version(),
+            install_requires=get_requirements(),
+        )
         
         # Run post-install if installing
         if "install" in sys.argv:
@@ -4,42 +4,95 @@ Comprehensive dialog windows for data entry, editing, and user interactions
 with modern UI design and validation.
 """
 
-import os
-from datetime import date, datetime
-from decimal import Decimal
-from typing import Dict, List, Optional, Any, Tuple
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from functools import lru_cache
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Dict, List, Optional, Any, Tuple, TYPE_CHECKING
 import logging
 
+# Only the widgets every dialog needs are imported here; heavier widgets,
+# services and helpers are imported by the methods that use them so that
+# opening the login dialog does not load the invoice machinery.
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QFormLayout,
-    QLabel, QPushButton, QLineEdit, QTextEdit, QComboBox, QDateEdit,
-    QCheckBox, QGroupBox, QTabWidget, QWidget, QScrollArea,
-    QDialogButtonBox, QMessageBox, QFileDialog, QProgressDialog,
-    QSplitter, QTableWidget, QTableWidgetItem, QHeaderView,
-    QFrame, QSpacerItem, QSizePolicy, QApplication
+    QDialog, QVBoxLayout, QFormLayout, QLabel, QLineEdit, QCheckBox,
+    QWidget, QDialogButtonBox, QMessageBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread, QTimer
-from PyQt6.QtGui import QFont, QPixmap, QIcon
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
 
-from models.database import (
-    Company, TkaWorker, TkaFamilyMember, JobDescription, 
-    Invoice, InvoiceLine, User, BankAccount
-)
-from services.invoice_service import InvoiceService
-from models.business import DataHelper, ValidationHelper
-from ui.widgets import (
-    SmartSearchWidget, CurrencyInputWidget, AutoCompleteComboBox,
-    NumericInputWidget, StatusIndicator, ModernButton, LoadingSpinner,
-    DataGridWidget, create_modern_button
+if TYPE_CHECKING:
+    from models.database import Company, TkaWorker
+
+logger = logging.getLogger(__name__)
+
+# Quiet period after the last keystroke before a form is re-validated (ms)
+VALIDATION_DEBOUNCE_MS = 150
+
+# Quiet period after the last keystroke before input is re-formatted (ms)
+FORMAT_DEBOUNCE_MS = 50
+
+# Company search results remembered per invoice dialog
+COMPANY_SEARCH_CACHE_SIZE = 128
+
+# NPWP is entered through a Qt input mask, so only digits can be typed
+NPWP_INPUT_MASK = "99.999.999.9-999.999;_"
+_NPWP_PATTERN = re.compile(r"^\d{2}\.\d{3}\.\d{3}\.\d-\d{3}\.\d{3}$")
+
+# DataGridWidget column definitions (read-only, shared by every refresh)
+_FAMILY_COLUMNS = (
+    {'key': 'nama', 'title': 'Name', 'type': 'text'},
+    {'key': 'passport', 'title': 'Passport', 'type': 'text'},
+    {'key': 'jenis_kelamin', 'title': 'Gender', 'type': 'text'},
+    {'key': 'relationship', 'title': 'Relationship', 'type': 'text'},
+    {'key': 'is_active', 'title': 'Status', 'type': 'status'},
 )
-from utils.validators import (
-    validate_company_data, validate_tka_worker_data, 
-    validate_job_description_data, ValidationResult
+
+_LINES_COLUMNS = (
+    {'key': 'baris', 'title': 'Line', 'type': 'text'},
+    {'key': 'tka_name', 'title': 'TKA Worker', 'type': 'text'},
+    {'key': 'job_name', 'title': 'Job Description', 'type': 'text'},
+    {'key': 'quantity', 'title': 'Qty', 'type': 'text'},
+    {'key': 'unit_price', 'title': 'Unit Price', 'type': 'currency'},
+    {'key': 'line_total', 'title': 'Line Total', 'type': 'currency'},
 )
-from utils.formatters import format_currency_idr, format_npwp_display
-from utils.helpers import safe_decimal, normalize_name
 
-logger = logging.getLogger(__name__)
+def _to_rupiah(value: Any) -> int:
+    """Convert an amount to whole rupiah, rounding half up"""
+    return int(Decimal(str(value)).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+def _qdate_to_date(qdate) -> date:
+    """Convert a QDate to datetime.date"""
+    return date(qdate.year(), qdate.month(), qdate.day())
+
+def _compute_totals(subtotal: int, vat_basis_points: int) -> Tuple[int, int, int]:
+    """Subtotal, VAT and total in whole rupiah, rounding VAT half up"""
+    vat_amount = (subtotal * vat_basis_points + 5000) // 10000
+    return subtotal, vat_amount, subtotal + vat_amount
+
+@lru_cache(maxsize=512)
+def _format_rupiah(amount: int) -> str:
+    """Cached format_currency_idr for whole-rupiah totals"""
+    from utils.formatters import format_currency_idr
+    return format_currency_idr(amount)
+
+@contextmanager
+def _batched_update(widget: QWidget):
+    """Suspend repaints and signals of widget so a refresh paints only once"""
+    widget.setUpdatesEnabled(False)
+    widget.blockSignals(True)
+    try:
+        yield widget
+    finally:
+        widget.blockSignals(False)
+        widget.setUpdatesEnabled(True)
+        widget.update()
+
+def _set_label_text(label: QLabel, text: str):
+    """Set label text only when it changed, avoiding a needless relayout"""
+    if label.text() != text:
+        label.setText(text)
 
 class BaseDialog(QDialog):
     """Base dialog with common functionality"""
@@ -49,6 +102,21 @@ class BaseDialog(QDialog):
         self.setWindowTitle(title)
         self.setModal(True)
         self.resize(600, 400)
+        
+        # Coalesce keystroke bursts into one validate/format call
+        self._validation_timer = QTimer(self)
+        self._validation_timer.setSingleShot(True)
+        self._validation_timer.setInterval(VALIDATION_DEBOUNCE_MS)
+        self._validation_timer.timeout.connect(self._do_validate)
+        
+        self._format_timer = QTimer(self)
+        self._format_timer.setSingleShot(True)
+        self._format_timer.setInterval(FORMAT_DEBOUNCE_MS)
+        self._format_timer.timeout.connect(self._do_format)
+        
+        # Validation error box, created on first use and then reused
+        self._error_box = None
+        
         self._setup_ui()
     
     def _setup_ui(self):
@@ -68,6 +136,9 @@ class BaseDialog(QDialog):
         self.button_box.accepted.connect(self.accept)
         self.button_box.rejected.connect(self.reject)
         self.main_layout.addWidget(self.button_box)
+        
+        # Looked up once; validation toggles it on every debounced edit
+        self._ok_button = self.button_box.button(QDialogButtonBox.StandardButton.Ok)
     
     def add_content_widget(self, widget: QWidget):
         """Add widget to content area"""
@@ -75,13 +146,49 @@ class BaseDialog(QDialog):
     
     def set_ok_button_text(self, text: str):
         """Set OK button text"""
-        ok_button = self.button_box.button(QDialogButtonBox.StandardButton.Ok)
-        ok_button.setText(text)
+        self._ok_button.setText(text)
     
     def enable_ok_button(self, enabled: bool):
         """Enable/disable OK button"""
-        ok_button = self.button_box.button(QDialogButtonBox.StandardButton.Ok)
-        ok_button.setEnabled(enabled)
+        if self._ok_button.isEnabled() != enabled:
+            self._ok_button.setEnabled(enabled)
+    
+    def _show_errors(self, errors: List[Dict[str, Any]]):
+        """Show validation errors in the dialog's reusable message box"""
+        if self._error_box is None:
+            self._error_box = QMessageBox(
+                QMessageBox.Icon.Warning, "Validation Error", "",
+                QMessageBox.StandardButton.Ok, self
+            )
+        self._error_box.setText(
+            "Please fix the following errors:\n\n" + "\n".join(error['message'] for error in errors)
+        )
+        self._error_box.exec()
+    
+    def _schedule_validate(self, *args):
+        """Restart the validation debounce timer"""
+        self._validation_timer.start()
+    
+    def _schedule_format(self, *args):
+        """Restart the formatting debounce timer"""
+        self._format_timer.start()
+    
+    def _flush_pending(self):
+        """Run any debounced format/validation that has not fired yet"""
+        if self._format_timer.isActive():
+            self._format_timer.stop()
+            self._do_format()
+        if self._validation_timer.isActive():
+            self._validation_timer.stop()
+            self._do_validate()
+    
+    def _do_validate(self):
+        """Validate form; overridden by subclasses"""
+        pass
+    
+    def _do_format(self):
+        """Format inputs; overridden by subclasses"""
+        pass
 
 class LoginDialog(BaseDialog):
     """User login dialog"""
@@ -137,14 +244,14 @@ class LoginDialog(BaseDialog):
     
     def _setup_connections(self):
         """Setup signal connections"""
-        self.username_input.textChanged.connect(self._validate_form)
-        self.password_input.textChanged.connect(self._validate_form)
+        self.username_input.textChanged.connect(self._schedule_validate)
+        self.password_input.textChanged.connect(self._schedule_validate)
         self.password_input.returnPressed.connect(self.accept)
         
         # Initial validation
-        self._validate_form()
+        self._do_validate()
     
-    def _validate_form(self):
+    def _do_validate(self):
         """Validate login form"""
         username = self.username_input.text().strip()
         password = self.password_input.text()
@@ -168,18 +275,21 @@ class LoginDialog(BaseDialog):
 class CompanyDialog(BaseDialog):
     """Company create/edit dialog"""
     
-    def __init__(self, company: Company = None, parent=None):
+    def __init__(self, company: "Company" = None, parent=None):
         self.company = company
         self.is_edit_mode = company is not None
         title = "Edit Company" if self.is_edit_mode else "Add New Company"
         super().__init__(title, parent)
         self._setup_company_ui()
-        self._setup_connections()
+        # Fill the form before wiring signals so loading doesn't queue validations
         if self.is_edit_mode:
             self._load_company_data()
+        self._setup_connections()
     
     def _setup_company_ui(self):
         """Setup company form UI"""
+        from PyQt6.QtWidgets import QTextEdit
+        
         # Main form
         form_widget = QWidget()
         form_layout = QFormLayout(form_widget)
@@ -192,8 +302,7 @@ class CompanyDialog(BaseDialog):
         
         # NPWP
         self.npwp_input = QLineEdit()
-        self.npwp_input.setPlaceholderText("XX.XXX.XXX.X-XXX.XXX")
-        self.npwp_input.setMaxLength(20)
+        self.npwp_input.setInputMask(NPWP_INPUT_MASK)
         form_layout.addRow("NPWP *:", self.npwp_input)
         
         # IDTKU
@@ -225,46 +334,23 @@ class CompanyDialog(BaseDialog):
     def _setup_connections(self):
         """Setup signal connections"""
         # Validation on text changes
-        self.company_name_input.textChanged.connect(self._validate_form)
-        self.npwp_input.textChanged.connect(self._validate_form)
-        self.idtku_input.textChanged.connect(self._validate_form)
-        self.address_input.textChanged.connect(self._validate_form)
-        
-        # NPWP formatting
-        self.npwp_input.textChanged.connect(self._format_npwp)
+        self.company_name_input.textChanged.connect(self._schedule_validate)
+        self.npwp_input.textChanged.connect(self._schedule_validate)
+        self.idtku_input.textChanged.connect(self._schedule_validate)
+        self.address_input.textChanged.connect(self._schedule_validate)
         
         # Initial validation
-        self._validate_form()
-    
-    def _format_npwp(self, text: str):
-        """Auto-format NPWP input"""
-        # Remove all non-digits
-        digits = ''.join(filter(str.isdigit, text))
-        
-        # Format as XX.XXX.XXX.X-XXX.XXX
-        if len(digits) <= 15:
-            formatted = digits
-            if len(digits) > 2:
-                formatted = f"{digits[:2]}.{digits[2:]}"
-            if len(digits) > 5:
-                formatted = f"{digits[:2]}.{digits[2:5]}.{digits[5:]}"
-            if len(digits) > 8:
-                formatted = f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}.{digits[8:]}"
-            if len(digits) > 9:
-                formatted = f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}.{digits[8]}-{digits[9:]}"
-            if len(digits) > 12:
-                formatted = f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}.{digits[8]}-{digits[9:12]}.{digits[12:]}"
-            
-            # Update input without triggering signal
-            self.npwp_input.blockSignals(True)
-            self.npwp_input.setText(formatted)
-            self.npwp_input.blockSignals(False)
+        self._do_validate()
+    
+    def _npwp_text(self) -> str:
+        """NPWP as entered, without input mask placeholders"""
+        return self.npwp_input.text().replace("_", "").strip()
     
-    def _validate_form(self):
+    def _do_validate(self):
         """Validate company form"""
         is_valid = (
             bool(self.company_name_input.text().strip()) and
-            bool(self.npwp_input.text().strip()) and
+            bool(_NPWP_PATTERN.match(self._npwp_text())) and
             bool(self.idtku_input.text().strip()) and
             bool(self.address_input.toPlainText().strip())
         )
@@ -283,7 +369,7 @@ class CompanyDialog(BaseDialog):
         """Get company data from form"""
         return {
             'company_name': self.company_name_input.text().strip(),
-            'npwp': self.npwp_input.text().strip(),
+            'npwp': self._npwp_text(),
             'idtku': self.idtku_input.text().strip(),
             'address': self.address_input.toPlainText().strip(),
             'is_active': self.status_checkbox.isChecked()
@@ -291,13 +377,20 @@ class CompanyDialog(BaseDialog):
     
     def accept(self):
         """Validate and accept"""
+        from utils.validators import validate_company_data
+        
+        self._flush_pending()
         company_data = self.get_company_data()
+        
+        # Cheap format check first; the full validator only runs on a well-formed NPWP
+        if not _NPWP_PATTERN.match(company_data['npwp']):
+            self._show_errors([{'message': "NPWP must be exactly 15 digits"}])
+            return
+        
         validation = validate_company_data(company_data)
         
         if not validation.is_valid:
-            error_msg = "Please fix the following errors:\n\n"
-            error_msg += "\n".join([error['message'] for error in validation.errors])
-            QMessageBox.warning(self, "Validation Error", error_msg)
+            self._show_errors(validation.errors)
             return
         
         super().accept()
@@ -305,18 +398,21 @@ class CompanyDialog(BaseDialog):
 class TkaWorkerDialog(BaseDialog):
     """TKA Worker create/edit dialog"""
     
-    def __init__(self, tka_worker: TkaWorker = None, parent=None):
+    def __init__(self, tka_worker: "TkaWorker" = None, parent=None):
         self.tka_worker = tka_worker
         self.is_edit_mode = tka_worker is not None
         title = "Edit TKA Worker" if self.is_edit_mode else "Add New TKA Worker"
         super().__init__(title, parent)
         self._setup_tka_ui()
-        self._setup_connections()
+        # Fill the form before wiring signals so loading doesn't queue validations
         if self.is_edit_mode:
             self._load_tka_data()
+        self._setup_connections()
     
     def _setup_tka_ui(self):
         """Setup TKA worker form UI"""
+        from PyQt6.QtWidgets import QTabWidget, QComboBox
+        
         # Create tabs for main info and family
         tab_widget = QTabWidget()
         
@@ -370,6 +466,9 @@ class TkaWorkerDialog(BaseDialog):
     
     def _create_family_tab(self) -> QWidget:
         """Create family members tab"""
+        from PyQt6.QtWidgets import QHBoxLayout
+        from ui.widgets import DataGridWidget, create_modern_button
+        
         family_widget = QWidget()
         layout = QVBoxLayout(family_widget)
         
@@ -400,24 +499,34 @@ class TkaWorkerDialog(BaseDialog):
     
     def _setup_connections(self):
         """Setup signal connections"""
-        self.nama_input.textChanged.connect(self._validate_form)
-        self.passport_input.textChanged.connect(self._validate_form)
+        self.nama_input.textChanged.connect(self._schedule_validate)
+        self.passport_input.textChanged.connect(self._schedule_validate)
         
         # Name formatting
-        self.nama_input.textChanged.connect(self._format_name)
+        self.nama_input.textChanged.connect(self._schedule_format)
         
         # Initial validation
-        self._validate_form()
+        self._do_validate()
     
-    def _format_name(self, text: str):
+    def _do_format(self):
         """Auto-format name input"""
+        from utils.helpers import normalize_name
+        
+        text = self.nama_input.text()
         formatted = normalize_name(text)
+        
+        # This runs after a typing pause, so keep a trailing space for the next word
+        if formatted and text[-1:].isspace():
+            formatted += ' '
+        
         if formatted != text:
+            cursor = self.nama_input.cursorPosition()
             self.nama_input.blockSignals(True)
             self.nama_input.setText(formatted)
+            self.nama_input.setCursorPosition(min(cursor, len(formatted)))
             self.nama_input.blockSignals(False)
     
-    def _validate_form(self):
+    def _do_validate(self):
         """Validate TKA form"""
         is_valid = (
             bool(self.nama_input.text().strip()) and
@@ -453,15 +562,8 @@ class TkaWorkerDialog(BaseDialog):
                 'is_active': family_member.is_active
             })
         
-        columns = [
-            {'key': 'nama', 'title': 'Name', 'type': 'text'},
-            {'key': 'passport', 'title': 'Passport', 'type': 'text'},
-            {'key': 'jenis_kelamin', 'title': 'Gender', 'type': 'text'},
-            {'key': 'relationship', 'title': 'Relationship', 'type': 'text'},
-            {'key': 'is_active', 'title': 'Status', 'type': 'status'}
-        ]
-        
-        self.family_table.set_data(family_data, columns)
+        with _batched_update(self.family_table):
+            self.family_table.set_data(family_data, _FAMILY_COLUMNS)
     
     def _add_family_member(self):
         """Add new family member"""
@@ -498,17 +600,47 @@ class TkaWorkerDialog(BaseDialog):
     
     def accept(self):
         """Validate and accept"""
+        from utils.validators import validate_tka_worker_data
+        
+        self._flush_pending()
         tka_data = self.get_tka_data()
         validation = validate_tka_worker_data(tka_data)
         
         if not validation.is_valid:
-            error_msg = "Please fix the following errors:\n\n"
-            error_msg += "\n".join([error['message'] for error in validation.errors])
-            QMessageBox.warning(self, "Validation Error", error_msg)
+            self._show_errors(validation.errors)
             return
         
         super().accept()
 
+class CompanySearchThread(QThread):
+    """Background company search so the invoice dialog keeps painting"""
+    
+    results_ready = pyqtSignal(str, list)
+    
+    def __init__(self, query: str, parent=None):
+        super().__init__(parent)
+        self.query = query
+    
+    def run(self):
+        """Run the search on its own session and emit plain dicts"""
+        from models.database import get_db_session
+        from models.business import SearchHelper
+        
+        session = get_db_session()
+        try:
+            companies = SearchHelper(session).search_companies(self.query)
+            results = [
+                {'id': company.id, 'company_name': company.company_name, 'npwp': company.npwp}
+                for company in companies
+            ]
+        except Exception as e:
+            logger.error(f"Company search failed: {e}")
+            return
+        finally:
+            session.close()
+        
+        self.results_ready.emit(self.query, results)
+
 class InvoiceCreateDialog(BaseDialog):
     """Invoice creation dialog with wizard-like interface"""
     
@@ -516,12 +648,21 @@ class InvoiceCreateDialog(BaseDialog):
         super().__init__("Create New Invoice", parent)
         self.resize(900, 700)
         self.selected_company = None
+        # Line amounts are kept as whole rupiah ints so totals never mix in floats
         self.invoice_lines = []
+        self._subtotal = 0  # running sum of line totals in whole rupiah
+        self._next_line_id = 1
+        self._last_totals_key = None  # (subtotal, VAT basis points) last shown
+        self._search_cache: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._pending_query = None
+        self._search_threads = set()
         self._setup_invoice_ui()
         self._setup_connections()
     
     def _setup_invoice_ui(self):
         """Setup invoice creation UI"""
+        from PyQt6.QtWidgets import QSplitter
+        
         # Create splitter for two-panel layout
         splitter = QSplitter(Qt.Orientation.Horizontal)
         
@@ -544,6 +685,9 @@ class InvoiceCreateDialog(BaseDialog):
     
     def _create_invoice_details_panel(self) -> QWidget:
         """Create invoice details panel"""
+        from PyQt6.QtWidgets import QDateEdit, QTextEdit, QGroupBox
+        from ui.widgets import SmartSearchWidget, NumericInputWidget
+        
         panel = QWidget()
         layout = QVBoxLayout(panel)
         
@@ -609,6 +753,9 @@ class InvoiceCreateDialog(BaseDialog):
     
     def _create_line_items_panel(self) -> QWidget:
         """Create line items panel"""
+        from PyQt6.QtWidgets import QHBoxLayout
+        from ui.widgets import DataGridWidget, create_modern_button
+        
         panel = QWidget()
         layout = QVBoxLayout(panel)
         
@@ -617,8 +764,10 @@ class InvoiceCreateDialog(BaseDialog):
         title_label.setStyleSheet("font-weight: bold; font-size: 14px; margin-bottom: 10px;")
         layout.addWidget(title_label)
         
-        # Line items table
+        # Line items table; lines stay in baris order so add and remove only refresh the rows they shift
         self.lines_table = DataGridWidget()
+        self.lines_table.setSortingEnabled(False)
+        self.lines_table.set_data(self.invoice_lines, _LINES_COLUMNS)
         layout.addWidget(self.lines_table)
         
         # Buttons
@@ -647,32 +796,52 @@ class InvoiceCreateDialog(BaseDialog):
         """Setup signal connections"""
         self.company_search.search_triggered.connect(self._search_companies)
         self.company_search.item_selected.connect(self._select_company)
-        self.vat_percentage.valueChanged.connect(self._update_totals)
+        self.vat_percentage.valueChanged.connect(self._on_vat_changed)
+        self._vat_basis_points = round(self.vat_percentage.value() * 100)
     
     def _search_companies(self, query: str):
-        """Search companies"""
-        # This would integrate with actual search service
-        # For now, mock some data
-        mock_companies = [
-            {'id': 1, 'company_name': 'PT Test Company 1', 'npwp': '12.345.678.9-012.345'},
-            {'id': 2, 'company_name': 'PT Test Company 2', 'npwp': '98.765.432.1-098.765'}
-        ]
+        """Search companies, reusing results for queries seen before"""
+        # SmartSearchWidget already debounces keystrokes before emitting
+        results = self._search_cache.get(query)
+        if results is not None:
+            self._search_cache.move_to_end(query)
+            self._pending_query = None
+            self.company_search.set_search_items(results)
+            return
         
-        self.company_search.set_search_items(mock_companies)
+        # Query the database off the GUI thread; results arrive via a queued signal
+        self._pending_query = query
+        thread = CompanySearchThread(query, self)
+        thread.results_ready.connect(self._on_companies_found)
+        thread.finished.connect(lambda: self._search_threads.discard(thread))
+        thread.finished.connect(thread.deleteLater)
+        self._search_threads.add(thread)
+        thread.start()
+    
+    def _on_companies_found(self, query: str, results: List[Dict]):
+        """Cache search results and show them if still wanted"""
+        self._search_cache[query] = results
+        if len(self._search_cache) > COMPANY_SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        
+        # Ignore answers to queries the user has already typed past
+        if query == self._pending_query:
+            self._pending_query = None
+            self.company_search.set_search_items(results)
     
     def _select_company(self, company_data: Dict):
         """Select company"""
         self.selected_company = company_data
         
         # Update company info display
-        info_text = f"<b>{company_data['company_name']}</b><br/>"
-        info_text += f"NPWP: {company_data['npwp']}"
-        self.company_info_label.setText(info_text)
+        self.company_info_label.setText(
+            f"<b>{company_data['company_name']}</b><br/>NPWP: {company_data['npwp']}"
+        )
         
         # Enable line item addition
         self.add_line_btn.setEnabled(True)
         
-        self._validate_form()
+        self._do_validate()
     
     def _add_line_item(self):
         """Add new line item"""
@@ -680,20 +849,27 @@ class InvoiceCreateDialog(BaseDialog):
             return
         
         # This would open line item dialog
+        quantity = 1
+        unit_price = _to_rupiah(5000000)
         mock_line = {
-            'id': len(self.invoice_lines) + 1,
+            'id': self._next_line_id,
             'baris': len(self.invoice_lines) + 1,
             'tka_name': 'John Doe',
             'job_name': 'Security Guard',
-            'quantity': 1,
-            'unit_price': 5000000,
-            'line_total': 5000000
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'line_total': quantity * unit_price
         }
+        self._next_line_id += 1
         
         self.invoice_lines.append(mock_line)
-        self._refresh_lines_table()
-        self._update_totals()
-        self._validate_form()
+        self._subtotal += mock_line['line_total']
+        
+        # Table, totals and OK button repaint together
+        with _batched_update(self):
+            self._refresh_lines_table(len(self.invoice_lines) - 1)
+            self._update_totals()
+            self._do_validate()
     
     def _edit_line_item(self):
         """Edit selected line item"""
@@ -703,39 +879,48 @@ class InvoiceCreateDialog(BaseDialog):
     
     def _remove_line_item(self):
         """Remove selected line item"""
-        selected = self.lines_table.get_selected_data()
-        if selected:
-            # Remove from list
-            self.invoice_lines = [line for line in self.invoice_lines if line['id'] != selected['id']]
-            self._refresh_lines_table()
-            self._update_totals()
-            self._validate_form()
+        index = self.lines_table.get_selected_row_index()
+        if index >= 0:
+            # Remove in place and renumber only the lines after it
+            removed = self.invoice_lines.pop(index)
+            self._subtotal -= removed['line_total']
+            for baris, line in enumerate(self.invoice_lines[index:], start=index + 1):
+                line['baris'] = baris
+            
+            with _batched_update(self):
+                self._refresh_lines_table(index)
+                self._update_totals()
+                self._do_validate()
     
-    def _refresh_lines_table(self):
-        """Refresh line items table"""
-        columns = [
-            {'key': 'baris', 'title': 'Line', 'type': 'text'},
-            {'key': 'tka_name', 'title': 'TKA Worker', 'type': 'text'},
-            {'key': 'job_name', 'title': 'Job Description', 'type': 'text'},
-            {'key': 'quantity', 'title': 'Qty', 'type': 'text'},
-            {'key': 'unit_price', 'title': 'Unit Price', 'type': 'currency'},
-            {'key': 'line_total', 'title': 'Line Total', 'type': 'currency'}
-        ]
-        
-        self.lines_table.set_data(self.invoice_lines, columns)
+    def _refresh_lines_table(self, start: int = 0):
+        """Refresh line items table from row start onwards
+        
+        The table shares the invoice_lines list, which is only ever changed in place.
+        """
+        with _batched_update(self.lines_table):
+            self.lines_table.update_rows(_LINES_COLUMNS, start)
+            if start == 0:
+                self.lines_table.resizeColumnsToContents()
+    
+    def _on_vat_changed(self, value: float):
+        """Track the VAT rate in basis points and refresh totals"""
+        self._vat_basis_points = round(value * 100)
+        self._update_totals()
     
     def _update_totals(self):
         """Update invoice totals"""
-        subtotal = sum(line['line_total'] for line in self.invoice_lines)
-        vat_rate = self.vat_percentage.value() / 100
-        vat_amount = subtotal * vat_rate
-        total_amount = subtotal + vat_amount
+        totals_key = (self._subtotal, self._vat_basis_points)
+        if totals_key == self._last_totals_key:
+            return
+        self._last_totals_key = totals_key
         
-        self.subtotal_label.setText(format_currency_idr(subtotal))
-        self.vat_label.setText(format_currency_idr(vat_amount))
-        self.total_label.setText(format_currency_idr(total_amount))
+        subtotal, vat_amount, total_amount = _compute_totals(self._subtotal, self._vat_basis_points)
+        
+        _set_label_text(self.subtotal_label, _format_rupiah(subtotal))
+        _set_label_text(self.vat_label, _format_rupiah(vat_amount))
+        _set_label_text(self.total_label, _format_rupiah(total_amount))
     
-    def _validate_form(self):
+    def _do_validate(self):
         """Validate invoice form"""
         is_valid = (
             self.selected_company is not None and
@@ -743,12 +928,18 @@ class InvoiceCreateDialog(BaseDialog):
         )
         self.enable_ok_button(is_valid)
     
+    def done(self, result: int):
+        """Let running searches finish before the dialog and its threads go away"""
+        for thread in list(self._search_threads):
+            thread.wait()
+        super().done(result)
+    
     def get_invoice_data(self) -> Dict[str, Any]:
         """Get invoice data"""
         return {
             'company_id': self.selected_company['id'] if self.selected_company else None,
-            'invoice_date': self.invoice_date.date().toPython(),
-            'vat_percentage': Decimal(str(self.vat_percentage.value())),
+            'invoice_date': _qdate_to_date(self.invoice_date.date()),
+            'vat_percentage': Decimal(self._vat_basis_points).scaleb(-2),
             'notes': self.notes_input.toPlainText().strip(),
             'line_items': self.invoice_lines
         }
@@ -761,14 +952,14 @@ def show_login_dialog(parent=None) -> Optional[Dict[str, Any]]:
         return dialog.get_credentials()
     return None
 
-def show_company_dialog(company: Company = None, parent=None) -> Optional[Dict[str, Any]]:
+def show_company_dialog(company: "Company" = None, parent=None) -> Optional[Dict[str, Any]]:
     """Show company dialog and return data"""
     dialog = CompanyDialog(company, parent)
     if dialog.exec() == QDialog.DialogCode.Accepted:
         return dialog.get_company_data()
     return None
 
-def show_tka_worker_dialog(tka_worker: TkaWorker = None, parent=None) -> Optional[Dict[str, Any]]:
+def show_tka_worker_dialog(tka_worker: "TkaWorker" = None, parent=None) -> Optional[Dict[str, Any]]:
     """Show TKA worker dialog and return data"""
     dialog = TkaWorkerDialog(tka_worker, parent)
     if dialog.exec() == QDialog.DialogCode.Accepted:
@@ -782,30 +973,87 @@ def show_invoice_create_dialog(parent=None) -> Optional[Dict[str, Any]]:
         return dialog.get_invoice_data()
     return None
 
+# Shared message boxes for the show_*_dialog helpers, one per icon
+_message_boxes: Dict[QMessageBox.Icon, QMessageBox] = {}
+
+def _new_message_box(icon: QMessageBox.Icon) -> QMessageBox:
+    """Create an empty message box for icon"""
+    box = QMessageBox()
+    box.setIcon(icon)
+    if icon == QMessageBox.Icon.Question:
+        box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        box.setDefaultButton(QMessageBox.StandardButton.No)
+    return box
+
+def _message_box(icon: QMessageBox.Icon, title: str, message: str, parent=None) -> QMessageBox:
+    """Get the shared message box for icon with its title, text and parent reset
+    
+    While the shared box is still open (a second message raised from its nested
+    event loop), a one-off box deleted on close is returned instead.
+    """
+    from PyQt6 import sip
+    
+    box = _message_boxes.get(icon)
+    # A box is deleted along with the last parent it was shown over
+    if box is None or sip.isdeleted(box):
+        box = _message_boxes[icon] = _new_message_box(icon)
+    elif box.isVisible():
+        box = _new_message_box(icon)
+        box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+    
+    if box.parent() is not parent:
+        box.setParent(parent, box.windowFlags())
+    box.setWindowTitle(title)
+    box.setText(message)
+    return box
+
+def prewarm_message_boxes():
+    """Create the shared message boxes up front so the first one shown opens instantly"""
+    for icon in (QMessageBox.Icon.Question, QMessageBox.Icon.Critical,
+                 QMessageBox.Icon.Information, QMessageBox.Icon.Warning):
+        _message_box(icon, "", "")
+
 def show_confirmation_dialog(title: str, message: str, parent=None) -> bool:
     """Show confirmation dialog"""
-    reply = QMessageBox.question(
-        parent, title, message,
-        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-        QMessageBox.StandardButton.No
-    )
-    return reply == QMessageBox.StandardButton.Yes
+    box = _message_box(QMessageBox.Icon.Question, title, message, parent)
+    box.setDefaultButton(QMessageBox.StandardButton.No)
+    box.exec()
+    clicked = box.clickedButton()
+    return clicked is not None and box.standardButton(clicked) == QMessageBox.StandardButton.Yes
+
+def show_confirmation_dialog_async(title: str, message: str, parent=None,
+                                   on_result: Optional[Callable[[bool], None]] = None) -> QMessageBox:
+    """Open a confirmation dialog without a nested event loop
+    
+    Returns immediately; on_result is called with True for Yes once the user answers.
+    """
+    box = QMessageBox(QMessageBox.Icon.Question, title, message,
+                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, parent)
+    box.setDefaultButton(QMessageBox.StandardButton.No)
+    box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+    if on_result is not None:
+        box.buttonClicked.connect(
+            lambda button: on_result(box.standardButton(button) == QMessageBox.StandardButton.Yes)
+        )
+    box.open()
+    return box
 
 def show_error_dialog(title: str, message: str, parent=None):
     """Show error dialog"""
-    QMessageBox.critical(parent, title, message)
+    _message_box(QMessageBox.Icon.Critical, title, message, parent).exec()
 
 def show_info_dialog(title: str, message: str, parent=None):
     """Show information dialog"""
-    QMessageBox.information(parent, title, message)
+    _message_box(QMessageBox.Icon.Information, title, message, parent).exec()
 
 def show_warning_dialog(title: str, message: str, parent=None):
     """Show warning dialog"""
-    QMessageBox.warning(parent, title, message)
+    _message_box(QMessageBox.Icon.Warning, title, message, parent).exec()
 
 if __name__ == "__main__":
     # Test dialogs
     import sys
+    from PyQt6.QtWidgets import QApplication
     
     app = QApplication(sys.argv)
     
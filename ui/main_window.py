@@ -32,8 +32,8 @@ from ui.widgets import (
 )
 from ui.dialogs import (
     show_login_dialog, show_company_dialog, show_tka_worker_dialog,
-    show_invoice_create_dialog, show_confirmation_dialog, show_error_dialog,
-    show_info_dialog, show_warning_dialog
+    show_invoice_create_dialog, show_confirmation_dialog, show_confirmation_dialog_async,
+    show_error_dialog, show_info_dialog, show_warning_dialog
 )
 from utils.formatters import format_currency_idr, format_date_short
 from config import app_config, ui_config
@@ -273,10 +273,15 @@ class InvoicesWidget(QWidget):
         """Delete selected invoice"""
         selected = self.invoices_table.get_selected_data()
         if selected:
-            if show_confirmation_dialog("Confirm Delete", 
-                                      f"Are you sure you want to delete invoice {selected.get('invoice_number', 'Unknown')}?", 
-                                      self):
-                show_info_dialog("Info", "Invoice deletion will be implemented", self)
+            def on_result(confirmed: bool):
+                if confirmed:
+                    show_info_dialog("Info", "Invoice deletion will be implemented", self)
+            
+            show_confirmation_dialog_async(
+                "Confirm Delete",
+                f"Are you sure you want to delete invoice {selected.get('invoice_number', 'Unknown')}?",
+                self, on_result
+            )
     
     def _export_invoices(self):
         """Export invoices"""
@@ -428,10 +433,15 @@ class CompaniesWidget(QWidget):
         """Delete selected company"""
         selected = self.companies_table.get_selected_data()
         if selected:
-            if show_confirmation_dialog("Confirm Delete", 
-                                      f"Are you sure you want to delete {selected.get('company_name', 'Unknown')}?", 
-                                      self):
-                show_info_dialog("Info", "Company deletion will be implemented", self)
+            def on_result(confirmed: bool):
+                if confirmed:
+                    show_info_dialog("Info", "Company deletion will be implemented", self)
+            
+            show_confirmation_dialog_async(
+                "Confirm Delete",
+                f"Are you sure you want to delete {selected.get('company_name', 'Unknown')}?",
+                self, on_result
+            )
     
     def _company_selected(self, row: int, data: dict):
         """Handle company selection"""
@@ -543,10 +553,15 @@ class TkaWorkersWidget(QWidget):
         """Delete selected worker"""
         selected = self.workers_table.get_selected_data()
         if selected:
-            if show_confirmation_dialog("Confirm Delete", 
-                                      f"Are you sure you want to delete {selected.get('nama', 'Unknown')}?", 
-                                      self):
-                show_info_dialog("Info", "Worker deletion will be implemented", self)
+            def on_result(confirmed: bool):
+                if confirmed:
+                    show_info_dialog("Info", "Worker deletion will be implemented", self)
+            
+            show_confirmation_dialog_async(
+                "Confirm Delete",
+                f"Are you sure you want to delete {selected.get('nama', 'Unknown')}?",
+                self, on_result
+            )
     
     def _worker_selected(self, row: int, data: dict):
         """Handle worker selection"""
@@ -36,6 +36,9 @@ from utils.helpers import safe_decimal, fuzzy_search_score
 
 logger = logging.getLogger(__name__)
 
+# Item data role holding the row_data index of a table row; it follows the row when sorted
+ROW_INDEX_ROLE = Qt.ItemDataRole.UserRole + 1
+
 class SearchCompleter(QCompleter):
     """Custom completer with fuzzy search support"""
     
@@ -44,6 +47,11 @@ class SearchCompleter(QCompleter):
         self.search_items = []
         self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
         self.setFilterMode(Qt.MatchFlag.MatchContains)
+        
+        # One model for the completer's lifetime; updates swap its list in a single reset
+        from PyQt6.QtCore import QStringListModel
+        self.string_model = QStringListModel(self)
+        self.setModel(self.string_model)
     
     def set_search_items(self, items: List[Dict[str, Any]]):
         """Set items for search completion"""
@@ -62,9 +70,7 @@ class SearchCompleter(QCompleter):
             if 'invoice_number' in item:
                 completion_strings.append(item['invoice_number'])
         
-        from PyQt6.QtCore import QStringListModel
-        model = QStringListModel(completion_strings)
-        self.setModel(model)
+        self.string_model.setStringList(completion_strings)
 
 class SmartSearchWidget(QWidget):
     """Advanced search widget with fuzzy matching and auto-completion"""
@@ -362,11 +368,30 @@ class DataGridWidget(QTableWidget):
         headers = [col['title'] for col in columns]
         self.setHorizontalHeaderLabels(headers)
         
-        # Setup rows
-        self.setRowCount(len(data))
+        # Setup rows and populate data
+        self.update_rows(columns)
+        
+        # Auto-resize columns
+        self.resizeColumnsToContents()
+    
+    def update_rows(self, columns: List[Dict[str, str]], start: int = 0):
+        """
+        Repopulate rows from start onwards after the data list changed in place
+        
+        Rows before start are left untouched, so appending or removing near the
+        end of a long list only rewrites the affected rows. A sortable table is
+        rewritten in full, since its rows need not be in row_data order.
+        """
+        sorting = self.isSortingEnabled()
+        if sorting:
+            # Items must not move while rows are written; Qt re-sorts when re-enabled
+            self.setSortingEnabled(False)
+            start = 0
+        
+        self.setRowCount(len(self.row_data))
         
-        # Populate data
-        for row_idx, row_data in enumerate(data):
+        for row_idx in range(start, len(self.row_data)):
+            row_data = self.row_data[row_idx]
             for col_idx, col_config in enumerate(columns):
                 value = row_data.get(col_config['key'], '')
                 
@@ -378,11 +403,13 @@ class DataGridWidget(QTableWidget):
                 
                 # Store original value
                 item.setData(Qt.ItemDataRole.UserRole, value)
+                if col_idx == 0:
+                    item.setData(ROW_INDEX_ROLE, row_idx)
                 
                 self.setItem(row_idx, col_idx, item)
         
-        # Auto-resize columns
-        self.resizeColumnsToContents()
+        if sorting:
+            self.setSortingEnabled(True)
     
     def _format_cell_value(self, value: Any, cell_type: str) -> str:
         """Format cell value based on type"""
@@ -402,25 +429,37 @@ class DataGridWidget(QTableWidget):
         else:
             return str(value)
     
+    def _data_index(self, row: int) -> int:
+        """Map a table row to its index in row_data, or -1 (rows move when sorted)"""
+        item = self.item(row, 0) if row >= 0 else None
+        index = item.data(ROW_INDEX_ROLE) if item is not None else None
+        if index is not None and 0 <= index < len(self.row_data):
+            return index
+        return -1
+    
     def _on_selection_changed(self):
         """Handle selection change"""
-        current_row = self.currentRow()
-        if 0 <= current_row < len(self.row_data):
-            self.row_selected.emit(current_row, self.row_data[current_row])
+        index = self._data_index(self.currentRow())
+        if index >= 0:
+            self.row_selected.emit(index, self.row_data[index])
     
     def _on_double_click(self, item):
         """Handle double click"""
-        row = item.row()
-        if 0 <= row < len(self.row_data):
-            self.row_double_clicked.emit(row, self.row_data[row])
+        index = self._data_index(item.row())
+        if index >= 0:
+            self.row_double_clicked.emit(index, self.row_data[index])
     
     def get_selected_data(self) -> Optional[Dict[str, Any]]:
         """Get currently selected row data"""
-        current_row = self.currentRow()
-        if 0 <= current_row < len(self.row_data):
-            return self.row_data[current_row]
+        index = self._data_index(self.currentRow())
+        if index >= 0:
+            return self.row_data[index]
         return None
     
+    def get_selected_row_index(self) -> int:
+        """Get index of the selected row in the data list, or -1"""
+        return self._data_index(self.currentRow())
+    
     def filter_data(self, filter_func: Callable[[Dict], bool]):
         """Filter table data"""
         filtered_data = [row for row in self.row_data if filter_func(row)]
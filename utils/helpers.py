@@ -23,20 +23,19 @@ def clean_string(text: str) -> str:
         return ""
     return ' '.join(text.strip().split())
 
+# Name particles kept in lower case by normalize_name
+_NAME_PARTICLES = frozenset(('van', 'de', 'del', 'da', 'bin', 'binti'))
+
 def normalize_name(name: str) -> str:
     """Normalize name with proper capitalization"""
     if not name:
         return ""
-    # Clean and split by space
-    words = clean_string(name).split()
-    # Capitalize each word except common prefixes/suffixes
+    # Split on any whitespace run (same result as clean_string(name).split())
+    # and capitalize each word except common prefixes/suffixes
     normalized_words = []
-    for word in words:
-        # Handle special cases
-        if word.lower() in ['van', 'de', 'del', 'da', 'bin', 'binti']:
-            normalized_words.append(word.lower())
-        else:
-            normalized_words.append(word.capitalize())
+    for word in name.split():
+        lower_word = word.lower()
+        normalized_words.append(lower_word if lower_word in _NAME_PARTICLES else word.capitalize())
     return ' '.join(normalized_words)
 
 def truncate_string(text: str, max_length: int, suffix: str = "...") -> str:
@@ -88,6 +87,16 @@ def safe_decimal(value: Any, default: Decimal = Decimal('0')) -> Decimal:
     except (ValueError, TypeError):
         return default
 
+def safe_int(value: Any, default: Optional[int] = None) -> Optional[int]:
+    """Safely convert value to int, accepting numeric strings such as form or CSV input"""
+    if value is None or isinstance(value, bool):
+        return default
+    
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
 def round_currency(amount: Union[Decimal, float, str], precision: int = 0) -> Decimal:
     """Round currency amount to specified precision"""
     decimal_amount = safe_decimal(amount)
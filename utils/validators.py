@@ -9,10 +9,18 @@ from decimal import Decimal
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 
-from utils.helpers import safe_decimal, clean_string
+from utils.helpers import safe_decimal, safe_int, clean_string
 
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import; the validators run on every form submit and import row
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_NON_ALNUM_RE = re.compile(r'[^A-Za-z0-9]')
+_LETTER_RE = re.compile(r'[A-Za-z]')
+_DIGIT_RE = re.compile(r'[0-9]')
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+
 class ValidationError(Exception):
     """Custom exception for validation errors"""
     def __init__(self, message: str, field: Optional[str] = None, code: Optional[str] = None):
@@ -139,8 +147,7 @@ def validate_email(email: str, field_name: str = "Email") -> ValidationResult:
     if not email:
         return result
     
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, email.strip()):
+    if not _EMAIL_RE.match(email.strip()):
         result.add_error(f"{field_name} format is invalid", field_name.lower(), "invalid_email")
     
     return result
@@ -153,7 +160,7 @@ def validate_phone(phone: str, field_name: str = "Phone") -> ValidationResult:
         return result
     
     # Remove all non-digits
-    digits = re.sub(r'[^\d]', '', phone)
+    digits = _NON_DIGIT_RE.sub('', phone)
     
     # Indonesian phone number validation (8-15 digits)
     if len(digits) < 8 or len(digits) > 15:
@@ -172,7 +179,7 @@ def validate_npwp(npwp: str, field_name: str = "NPWP") -> ValidationResult:
         return result
     
     # Remove all non-digits
-    digits = re.sub(r'[^\d]', '', npwp)
+    digits = _NON_DIGIT_RE.sub('', npwp)
     
     # NPWP must be exactly 15 digits
     if len(digits) != 15:
@@ -195,7 +202,7 @@ def validate_passport(passport: str, field_name: str = "Passport") -> Validation
         return result
     
     # Clean passport (alphanumeric only)
-    cleaned = re.sub(r'[^A-Za-z0-9]', '', passport)
+    cleaned = _NON_ALNUM_RE.sub('', passport)
     
     # Passport should be 6-20 alphanumeric characters
     if len(cleaned) < 6:
@@ -204,7 +211,7 @@ def validate_passport(passport: str, field_name: str = "Passport") -> Validation
         result.add_error(f"{field_name} cannot exceed 20 characters", field_name.lower(), "too_long")
     
     # Must contain at least one letter and one number (typical passport format)
-    if not re.search(r'[A-Za-z]', cleaned) or not re.search(r'[0-9]', cleaned):
+    if not _LETTER_RE.search(cleaned) or not _DIGIT_RE.search(cleaned):
         result.add_warning(f"{field_name} should contain both letters and numbers", field_name.lower(), "passport_format")
     
     return result
@@ -291,7 +298,7 @@ def validate_user_data(user_data: Dict[str, Any]) -> ValidationResult:
             result.errors.extend(username_result.errors)
         
         # Username should be alphanumeric with underscores
-        if not re.match(r'^[a-zA-Z0-9_]+$', username):
+        if not _USERNAME_RE.match(username):
             result.add_error("Username can only contain letters, numbers, and underscores", "username", "invalid_username")
     
     # Full name validation
@@ -483,8 +490,13 @@ def validate_invoice_data(invoice_data: Dict[str, Any]) -> ValidationResult:
     
     return result
 
-def validate_invoice_line_data(line_data: Dict[str, Any]) -> ValidationResult:
-    """Validate invoice line data"""
+def validate_invoice_line_data(line_data: Dict[str, Any], *,
+                               jobs_map: Optional[Dict[int, Any]] = None) -> ValidationResult:
+    """Validate invoice line data
+    
+    With jobs_map (job descriptions already loaded by integer ID), an unknown
+    job_description_id is reported here instead of failing at insert time.
+    """
     result = ValidationResult()
     
     # Required fields
@@ -524,6 +536,15 @@ def validate_invoice_line_data(line_data: Dict[str, Any]) -> ValidationResult:
         if not baris_result.is_valid:
             result.errors.extend(baris_result.errors)
     
+    # Job description existence
+    job_description_id = line_data.get('job_description_id')
+    if jobs_map is not None:
+        if job_description_id is None:
+            # The required check above recorded the error; lines cannot be inserted without a job
+            result.is_valid = False
+        elif safe_int(job_description_id) not in jobs_map:
+            result.add_error("Job description not found", "job_description_id", "not_found")
+    
     return result
 
 # ========== BULK VALIDATION ==========